@@ -1,90 +1,141 @@
 """Quick start script to test the LLM integration"""
 
 import asyncio
+import argparse
+import contextlib
 import sys
 from pathlib import Path
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
+from rich.text import Text
 
-# Add project root to path
-sys.path.append(str(Path(__file__).parent.parent))
+# Add project root to path (once, even if this module is re-imported)
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 
-from src.core.llm_manager import LLMManager
+from src.core.config import settings, configure_logging
+from src.core.llm_manager import get_manager, close_manager
+from src.core.response_cache import CachedLLMManager
 
 console = Console()
 
-async def interactive_demo():
+# Static renderables are built once instead of on every loop iteration
+SEPARATOR = Text("\n" + "=" * 50 + "\n")
+
+MENU_TEXT = Text.from_markup("""
+[bold blue]Week 1: LLM Integration Demo[/bold blue]
+
+This script demonstrates the multi-LLM integration with:
+- OpenAI API
+- Ollama (local server)  
+- Local GGUF models
+
+Choose an option:
+1. Interactive Demo
+2. Run Examples
+3. Exit
+""")
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Quick start demo for the JSON Generator")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the LLM instead of reusing cached responses"
+    )
+    return parser.parse_args()
+
+async def interactive_demo(use_cache: bool = True):
     """Run an interactive demo of the LLM system"""
     console.print("[bold blue]JSON Generator - LLM Integration Demo[/bold blue]\n")
     
     # Initialize LLM Manager
     console.print("Initializing LLM Manager...")
-    manager = LLMManager()
     
     try:
-        await manager.initialize()
+        manager = await get_manager()
     except Exception as e:
         console.print(f"[red]Failed to initialize: {e}[/red]")
         return
     
+    if use_cache:
+        manager = CachedLLMManager(manager)
+    
     console.print(f"\n[green]Available models:[/green] {', '.join(manager.available_models)}")
     
-    while True:
-        console.print("\n" + "="*50 + "\n")
-        
-        # Get user input
-        prompt = Prompt.ask("[cyan]Enter a prompt (or 'quit' to exit)[/cyan]")
-        
-        if prompt.lower() in ['quit', 'exit', 'q']:
-            break
-        
-        # Model selection
-        if len(manager.available_models) > 1:
-            console.print(f"\nAvailable models: {manager.available_models}")
-            model = Prompt.ask(
-                "Which model to use?",
-                choices=manager.available_models + ["auto"],
-                default="auto"
-            )
-            
-            if model == "auto":
-                model = None
-        else:
-            model = None
-        
-        # Generate response
-        try:
-            console.print("\n[yellow]Generating response...[/yellow]")
-            response = await manager.generate(prompt, model=model)
+    # Load the default model in the background while the user types
+    warmup_task = asyncio.create_task(manager.warmup())
+    try:
+        while True:
+            console.print(SEPARATOR)
             
-            console.print(f"\n[green]Response ({response.model}):[/green]")
-            console.print(response.content)
+            # Get user input off the event loop so background tasks keep running
+            prompt = await asyncio.to_thread(Prompt.ask, "[cyan]Enter a prompt (or 'quit' to exit)[/cyan]")
             
-            if response.usage:
-                console.print(f"\n[dim]Tokens used: {response.usage}[/dim]")
+            if prompt.lower() in ['quit', 'exit', 'q']:
+                break
             
-        except Exception as e:
-            console.print(f"[red]Error: {e}[/red]")
-        
-        # Ask if user wants to test JSON generation
-        if Confirm.ask("\nTest JSON generation?", default=False):
-            json_prompt = Prompt.ask("Enter JSON generation prompt")
+            # Model selection
+            if len(manager.available_models) > 1:
+                console.print(f"\nAvailable models: {manager.available_models}")
+                model = await asyncio.to_thread(
+                    Prompt.ask,
+                    "Which model to use?",
+                    choices=manager.available_models + ["auto"],
+                    default="auto"
+                )
+                
+                if model == "auto":
+                    model = None
+            else:
+                model = None
             
+            # Generate response
             try:
-                json_response = await manager.generate_json(json_prompt)
-                console.print("\n[green]Generated JSON:[/green]")
-                console.print_json(data=json_response)
+                console.print("\n[yellow]Generating response...[/yellow]")
+                console.print(f"\n[green]Response ({model or manager.default_model}):[/green]")
+                
+                # Print tokens as they arrive instead of waiting for the full completion;
+                # the provider fills usage once the stream ends
+                usage = {}
+                async for chunk in manager.generate_stream(prompt, model=model, usage=usage):
+                    console.print(chunk, end="", soft_wrap=True, markup=False, highlight=False)
+                console.print()
+                
+                if usage:
+                    console.print(f"\n[dim]Tokens used: {usage}[/dim]")
+                
             except Exception as e:
-                console.print(f"[red]JSON generation error: {e}[/red]")
+                console.print(f"[red]Error: {e}[/red]")
+            
+            # Ask if user wants to test JSON generation
+            if await asyncio.to_thread(Confirm.ask, "\nTest JSON generation?", default=False):
+                json_prompt = await asyncio.to_thread(Prompt.ask, "Enter JSON generation prompt")
+                
+                try:
+                    json_response = await manager.generate_json(json_prompt)
+                    console.print("\n[green]Generated JSON:[/green]")
+                    console.print_json(data=json_response)
+                except Exception as e:
+                    console.print(f"[red]JSON generation error: {e}[/red]")
+    finally:
+        warmup_task.cancel()
+        # Let the warmup unwind before its provider's connections are closed
+        with contextlib.suppress(asyncio.CancelledError):
+            await warmup_task
+        await close_manager()
     
     console.print("\n[bold green]Thanks for testing![/bold green]")
 
-async def run_examples():
+async def run_examples(use_cache: bool = True):
     """Run example generations"""
     console.print("[bold]Running example generations...[/bold]\n")
     
-    manager = LLMManager()
-    await manager.initialize()
+    manager = await get_manager()
+    if use_cache:
+        manager = CachedLLMManager(manager)
     
     examples = [
         {
@@ -101,41 +152,37 @@ async def run_examples():
         }
     ]
     
-    for example in examples:
-        console.print(f"\n[cyan]Example: {example['name']}[/cyan]")
-        console.print(f"Prompt: {example['prompt']}")
-        
-        try:
-            response = await manager.generate_json(example['prompt'])
-            console.print("[green]Generated:[/green]")
-            console.print_json(data=response)
-        except Exception as e:
-            console.print(f"[red]Failed: {e}[/red]")
+    try:
+        # The examples are independent, so dispatch them as one batch
+        responses = await manager.generate_json_batch([example['prompt'] for example in examples])
 
-async def main():
-    """Main entry point"""
-    console.print("""
-[bold blue]Week 1: LLM Integration Demo[/bold blue]
+        for example, response in zip(examples, responses):
+            console.print(f"\n[cyan]Example: {example['name']}[/cyan]")
+            console.print(f"Prompt: {example['prompt']}", markup=False, highlight=False)
 
-This script demonstrates the multi-LLM integration with:
-- OpenAI API
-- Ollama (local server)  
-- Local GGUF models
+            if isinstance(response, Exception):
+                console.print(f"[red]Failed: {response}[/red]")
+            else:
+                console.print("[green]Generated:[/green]")
+                console.print_json(data=response)
+    finally:
+        await close_manager()
 
-Choose an option:
-1. Interactive Demo
-2. Run Examples
-3. Exit
-""")
+async def main(use_cache: bool = True):
+    """Main entry point"""
+    console.print(MENU_TEXT)
     
     choice = Prompt.ask("Select option", choices=["1", "2", "3"], default="1")
     
     if choice == "1":
-        await interactive_demo()
+        await interactive_demo(use_cache)
     elif choice == "2":
-        await run_examples()
+        await run_examples(use_cache)
     else:
         console.print("Goodbye!")
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    configure_logging()
+    settings.ensure_dirs()
+    args = parse_arguments()
+    asyncio.run(main(use_cache=not args.no_cache)) 
\ No newline at end of file
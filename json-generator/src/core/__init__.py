@@ -1,7 +1,27 @@
 """Core LLM and generation functionality"""
 
-from .llm_manager import LLMManager
-from .base_llm import GenerationConfig, LLMResponse
-from .config import settings
+import importlib
+
+# Public names are resolved on first access (PEP 562) so that importing a
+# light submodule such as ``src.core.config`` does not drag in every
+# provider SDK through ``llm_manager``.
+_LAZY_ATTRS = {
+    "LLMManager": ".llm_manager",
+    "GenerationConfig": ".base_llm",
+    "LLMResponse": ".base_llm",
+    "settings": ".config",
+}
 
 __all__ = ["LLMManager", "GenerationConfig", "LLMResponse", "settings"]
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
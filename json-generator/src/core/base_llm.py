@@ -2,13 +2,83 @@
 
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, AsyncGenerator, Any
-from dataclasses import dataclass
+import asyncio
+from dataclasses import asdict, dataclass, replace
+import hashlib
 import json
 import logging
+import re
 from enum import Enum
+from functools import lru_cache
+from itertools import chain
+
+from .config import settings
+
+try:
+    import ijson
+except ImportError:  # Optional: enables incremental parsing in generate_json_stream
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
+# JSON wrapped in a markdown code fence, e.g. ```json {...} ```
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+def _iter_json_objects(text: str):
+    """Yield top-level brace-balanced {...} spans, ignoring braces inside strings"""
+    depth = 0
+    start = -1
+    in_string = False
+    escaped = False
+    
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            if depth:
+                in_string = True
+        elif ch == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                yield text[start:i + 1]
+
+@lru_cache(maxsize=64)
+def _schema_to_text(schema_key: str) -> str:
+    """Pretty-print a schema given its compact JSON form"""
+    return json.dumps(json.loads(schema_key), indent=2)
+
+class _AsyncChunkReader:
+    """Async file-like adapter that lets ijson read from a stream of text chunks"""
+    
+    def __init__(self, chunks: AsyncGenerator[str, None]):
+        self._chunks = chunks
+        self._buffer = b""
+        # First non-whitespace byte read, which tells the top-level JSON type
+        self.first_byte: Optional[bytes] = None
+    
+    async def read(self, size: int = -1) -> bytes:
+        while not self._buffer:
+            try:
+                self._buffer = (await self._chunks.__anext__()).encode()
+            except StopAsyncIteration:
+                return b""
+            if self.first_byte is None and self._buffer.strip():
+                self.first_byte = self._buffer.strip()[:1]
+        
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
 class LLMProvider(Enum):
     """Supported LLM providers"""
     OPENAI = "openai"
@@ -17,7 +87,7 @@ class LLMProvider(Enum):
     ANTHROPIC = "anthropic"
     GOOGLE = "google"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LLMResponse:
     """Standardized LLM response"""
     content: str
@@ -26,7 +96,7 @@ class LLMResponse:
     usage: Optional[Dict[str, int]] = None
     metadata: Optional[Dict[str, Any]] = None
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GenerationConfig:
     """Configuration for generation"""
     temperature: float = 0.7
@@ -37,13 +107,38 @@ class GenerationConfig:
     stop_sequences: Optional[List[str]] = None
     response_format: Optional[str] = None  # "json" or None
 
+def make_cache_key(
+    provider: str,
+    model: str,
+    prompt: str,
+    config: Optional[GenerationConfig] = None,
+    **extra: Any
+) -> str:
+    """Build a stable cache key for a generation request"""
+    payload = {
+        "provider": provider,
+        "model": model,
+        "prompt": prompt,
+        "config": asdict(config) if config else None,
+    }
+    payload.update(extra)
+    raw = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
 class BaseLLM(ABC):
     """Abstract base class for all LLM implementations"""
     
-    def __init__(self, model_name: str, provider: LLMProvider):
+    def __init__(
+        self,
+        model_name: str,
+        provider: LLMProvider,
+        max_concurrency: Optional[int] = None
+    ):
         self.model_name = model_name
         self.provider = provider
         self._is_initialized = False
+        # Bounds in-flight requests to this provider; subclasses hold it around API calls
+        self._semaphore = asyncio.Semaphore(max_concurrency or settings.llm.max_concurrent_requests)
         
     async def initialize(self) -> None:
         """Initialize the LLM (load models, check connections, etc.)"""
@@ -69,9 +164,10 @@ class BaseLLM(ABC):
     async def generate_stream(
         self, 
         prompt: str, 
-        config: Optional[GenerationConfig] = None
+        config: Optional[GenerationConfig] = None,
+        usage: Optional[Dict[str, int]] = None
     ) -> AsyncGenerator[str, None]:
-        """Generate a streaming response"""
+        """Generate a streaming response, filling usage with token counts once it ends"""
         pass
     
     async def generate_json(
@@ -86,7 +182,7 @@ class BaseLLM(ABC):
         
         # Add JSON formatting to prompt
         json_prompt = self._format_json_prompt(prompt, schema)
-        config.response_format = "json"
+        config = replace(config, response_format="json")
         
         response = await self.generate(json_prompt, config)
         
@@ -97,27 +193,136 @@ class BaseLLM(ABC):
             # Try to extract JSON from response
             return self._extract_json(response.content)
     
+    async def generate_json_stream(
+        self,
+        prompt: str,
+        schema: Optional[Dict] = None,
+        config: Optional[GenerationConfig] = None
+    ) -> AsyncGenerator[tuple, None]:
+        """Yield (key, value) pairs of the generated JSON object as each one completes
+
+        Only a top-level object can be streamed this way; an array or scalar
+        response raises LLMGenerationError, so use generate_json for those.
+        """
+        if ijson is None or not settings.app.enable_streaming:
+            result = await self.generate_json(prompt, schema, config)
+            for item in self._object_items(result):
+                yield item
+            return
+        
+        config = replace(config or GenerationConfig(), response_format="json")
+        json_prompt = self._format_json_prompt(prompt, schema)
+        stream = self.generate_stream(json_prompt, config)
+        reader = _AsyncChunkReader(stream)
+        
+        yielded = False
+        try:
+            async for key, value in ijson.kvitems_async(reader, "", use_float=True):
+                yielded = True
+                yield key, value
+            if not yielded and reader.first_byte != b"{":
+                raise LLMGenerationError(
+                    "Expected a streamed JSON object, got one starting with "
+                    f"{reader.first_byte!r}"
+                )
+            return
+        except ijson.JSONError as e:
+            if yielded:
+                raise LLMGenerationError(f"Streamed JSON was malformed: {e}")
+            logger.warning(f"Streamed JSON could not be parsed, falling back: {e}")
+        finally:
+            # Release the stream's semaphore slot and HTTP response before any
+            # fallback request, and when the caller stops iterating early
+            await stream.aclose()
+        
+        # Nothing usable arrived yet, so retry with the buffered extractor
+        result = await self.generate_json(prompt, schema, config)
+        for item in self._object_items(result):
+            yield item
+    
+    @staticmethod
+    def _object_items(result: Any) -> List[tuple]:
+        """Return the items of a parsed JSON object, rejecting any other JSON type"""
+        if not isinstance(result, dict):
+            raise LLMGenerationError(
+                f"Expected a JSON object, got {type(result).__name__}"
+            )
+        return list(result.items())
+    
+    async def generate_json_batch(
+        self,
+        prompts: List[str],
+        schema: Optional[Dict] = None,
+        config: Optional[GenerationConfig] = None,
+        batch_size: Optional[int] = None
+    ) -> List[Dict]:
+        """Generate JSON for several prompts, packing up to batch_size into each request"""
+        batch_size = batch_size or settings.llm.json_batch_size
+        chunks = [prompts[i:i + batch_size] for i in range(0, len(prompts), batch_size)]
+        
+        chunk_results = await asyncio.gather(
+            *(self._generate_json_chunk(chunk, schema, config) for chunk in chunks),
+            return_exceptions=True
+        )
+        
+        # Results keep prompt order; a failed request puts its exception in place
+        # of each of its prompts instead of failing the whole batch
+        results = []
+        for chunk, result in zip(chunks, chunk_results):
+            results.extend([result] * len(chunk) if isinstance(result, Exception) else result)
+        return results
+    
+    async def _generate_json_chunk(
+        self,
+        prompts: List[str],
+        schema: Optional[Dict],
+        config: Optional[GenerationConfig]
+    ) -> List[Dict]:
+        """Answer several prompts with one request, falling back to one request each"""
+        if len(prompts) == 1:
+            return [await self.generate_json(prompts[0], schema, config)]
+        
+        n = len(prompts)
+        # JSON modes require an object at the top level, so wrap the array
+        batch_prompt = (
+            f'Return a JSON object with a single key "items" holding an array of exactly {n} '
+            f"JSON values. Item i answers Input i.\n\n"
+            + "\n".join(f"Input {i}: {prompt}" for i, prompt in enumerate(prompts))
+        )
+        batch_schema = {"items": [schema]} if schema else None
+        
+        result = await self.generate_json(batch_prompt, batch_schema, config)
+        items = result.get("items") if isinstance(result, dict) else None
+        if isinstance(items, list) and len(items) == n:
+            return items
+        
+        logger.warning(f"Batched JSON response did not contain {n} items; retrying individually")
+        return list(await asyncio.gather(
+            *(self.generate_json(prompt, schema, config) for prompt in prompts),
+            return_exceptions=True
+        ))
+    
     def _format_json_prompt(self, prompt: str, schema: Optional[Dict]) -> str:
         """Format prompt for JSON generation"""
         json_instruction = "\n\nProvide your response as valid JSON."
         
         if schema:
-            json_instruction += f"\n\nFollow this schema:\n{json.dumps(schema, indent=2)}"
+            # The compact dump uses the C encoder; the indented text is cached per schema
+            schema_text = _schema_to_text(json.dumps(schema))
+            json_instruction += f"\n\nFollow this schema:\n{schema_text}"
         
         return prompt + json_instruction
     
     def _extract_json(self, text: str) -> Dict:
         """Try to extract JSON from text"""
-        import re
-        
-        # Try to find JSON in the text
-        json_pattern = r'\{[^{}]*\}'
-        matches = re.findall(json_pattern, text)
+        # Prefer an explicit ```json fence, then any balanced object in the text
+        fence = _JSON_FENCE_RE.search(text)
+        candidates = [fence.group(1)] if fence else []
         
-        for match in matches:
+        for match in chain(candidates, _iter_json_objects(text)):
             try:
                 return json.loads(match)
-            except:
+            except json.JSONDecodeError:
                 continue
         
         # If no valid JSON found, return empty dict
@@ -129,6 +334,10 @@ class BaseLLM(ABC):
         """Test if the LLM is accessible"""
         pass
     
+    async def close(self) -> None:
+        """Release any network resources held by the LLM"""
+        pass
+    
     @property
     def info(self) -> Dict[str, str]:
         """Get information about the LLM"""
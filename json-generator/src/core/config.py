@@ -1,11 +1,17 @@
 """Configuration management for the JSON Generator"""
 
+import logging
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any
-from pydantic_settings import BaseSettings
-from pydantic import Field, validator
+from types import MappingProxyType
+from typing import Optional, Any, Mapping
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field, PrivateAttr, model_validator
 from dotenv import load_dotenv
+from rich.logging import RichHandler
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -23,6 +29,8 @@ class LLMConfig(BaseSettings):
     ollama_host: str = Field("http://localhost:11434", env="OLLAMA_HOST")
     ollama_model: str = Field("llama3.1:8b", env="OLLAMA_MODEL")
     ollama_timeout: int = Field(120, env="OLLAMA_TIMEOUT")
+    # Matches the server's OLLAMA_NUM_PARALLEL so extra requests wait client-side
+    ollama_num_parallel: int = Field(4, validation_alias="OLLAMA_NUM_PARALLEL")
     
     # Local Model Configuration
     local_model_path: Optional[str] = Field(None, env="LOCAL_MODEL_PATH")
@@ -30,15 +38,36 @@ class LLMConfig(BaseSettings):
     local_model_device: str = Field("cpu", env="LOCAL_MODEL_DEVICE")
     local_model_gpu_layers: int = Field(0, env="LOCAL_MODEL_GPU_LAYERS")
     
-    @validator("local_model_path")
-    def validate_model_path(cls, v):
-        if v and not Path(v).exists():
-            print(f"⚠️  Warning: Local model path '{v}' does not exist")
-        return v
+    # Concurrency (env names differ from the field names, so they need aliases)
+    max_concurrent_requests: int = Field(4, validation_alias="LLM_MAX_CONCURRENCY")
+    # Bounds probe generation only; initialization may first pull a model
+    probe_timeout: float = Field(15.0, validation_alias="LLM_PROBE_TIMEOUT")
+    json_batch_size: int = Field(8, validation_alias="LLM_JSON_BATCH_SIZE")
+    
+    # Resolved once at load time so callers don't stat the file again
+    _local_model_file: Optional[Path] = PrivateAttr(None)
+    _local_model_exists: bool = PrivateAttr(False)
+    
+    @model_validator(mode="after")
+    def validate_model_path(self):
+        if self.local_model_path:
+            self._local_model_file = Path(self.local_model_path)
+            self._local_model_exists = self._local_model_file.exists()
+            if not self._local_model_exists:
+                logger.warning(
+                    f"Local model path '{self.local_model_path}' does not exist"
+                )
+        return self
+    
+    @property
+    def local_model_file(self) -> Optional[Path]:
+        return self._local_model_file
+    
+    @property
+    def local_model_exists(self) -> bool:
+        return self._local_model_exists
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, frozen=True)
 
 class AppConfig(BaseSettings):
     """Application configuration"""
@@ -49,26 +78,28 @@ class AppConfig(BaseSettings):
     
     # Paths
     project_root: Path = Path(__file__).parent.parent.parent
-    models_dir: Optional[Path] = None
-    data_dir: Optional[Path] = None
-    cache_dir: Optional[Path] = None
     
     # Feature flags
     enable_web_search: bool = Field(True, env="ENABLE_WEB_SEARCH")
     enable_caching: bool = Field(True, env="ENABLE_CACHING")
     enable_streaming: bool = Field(True, env="ENABLE_STREAMING")
     
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # Set up paths after initialization
-        self.models_dir = self.project_root / "models"
-        self.data_dir = self.project_root / "data"
-        self.cache_dir = self.data_dir / "cache"
-        
-        # Create directories if they don't exist
-        self.models_dir.mkdir(exist_ok=True)
-        self.data_dir.mkdir(exist_ok=True)
-        self.cache_dir.mkdir(exist_ok=True)
+    @property
+    def models_dir(self) -> Path:
+        return self.project_root / "models"
+    
+    @property
+    def data_dir(self) -> Path:
+        return self.project_root / "data"
+    
+    @property
+    def cache_dir(self) -> Path:
+        return self.data_dir / "cache"
+    
+    def ensure_dirs(self) -> None:
+        """Create the model, data and cache directories if they don't exist"""
+        for path in (self.models_dir, self.data_dir, self.cache_dir):
+            path.mkdir(parents=True, exist_ok=True)
     
     @property
     def is_development(self) -> bool:
@@ -78,55 +109,67 @@ class AppConfig(BaseSettings):
     def is_production(self) -> bool:
         return self.app_env == "production"
     
-    class Config:
-        env_file = ".env"
+    model_config = SettingsConfigDict(env_file=".env", frozen=True)
 
 class Settings:
-    """Global settings singleton"""
-    
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.app = AppConfig()
-            cls._instance.llm = LLMConfig()
-        return cls._instance
-    
-    def get_llm_config(self, provider: str) -> Dict[str, Any]:
-        """Get configuration for specific LLM provider"""
-        if provider == "openai":
-            return {
+    """Global settings; use get_settings() for the shared instance"""
+    
+    def __init__(self):
+        self.app = AppConfig()
+        self.llm = LLMConfig()
+        # Both configs are frozen, so the per-provider views can be built once
+        self._provider_configs = MappingProxyType({
+            "openai": MappingProxyType({
                 "api_key": self.llm.openai_api_key,
                 "model": self.llm.openai_model,
                 "temperature": self.llm.openai_temperature,
                 "max_tokens": self.llm.openai_max_tokens,
-            }
-        elif provider == "ollama":
-            return {
+            }),
+            "ollama": MappingProxyType({
                 "host": self.llm.ollama_host,
                 "model": self.llm.ollama_model,
                 "timeout": self.llm.ollama_timeout,
-            }
-        elif provider == "local":
-            return {
+            }),
+            "local": MappingProxyType({
                 "model_path": self.llm.local_model_path,
                 "model_type": self.llm.local_model_type,
                 "device": self.llm.local_model_device,
                 "n_gpu_layers": self.llm.local_model_gpu_layers,
-            }
-        else:
+            }),
+        })
+    
+    def ensure_dirs(self) -> None:
+        """Create the application's working directories"""
+        self.app.ensure_dirs()
+    
+    def get_llm_config(self, provider: str) -> Mapping[str, Any]:
+        """Get configuration for specific LLM provider"""
+        try:
+            return self._provider_configs[provider]
+        except KeyError:
             raise ValueError(f"Unknown provider: {provider}")
 
-# Create global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, built on first use"""
+    return Settings()
 
-# Logging configuration
-import logging
-from rich.logging import RichHandler
+class _LazySettings:
+    """Module-level handle that builds the shared Settings on first attribute access"""
+    
+    __slots__ = ()
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+    
+    def __repr__(self) -> str:
+        return repr(get_settings())
+
+# Global settings handle; nothing is read from the environment until it's used
+settings = _LazySettings()
 
-def setup_logging():
-    """Configure logging with Rich handler"""
+def configure_logging():
+    """Configure logging with Rich handler; call once from entry points"""
     logging.basicConfig(
         level=getattr(logging, settings.app.log_level),
         format="%(message)s",
@@ -137,6 +180,3 @@ def setup_logging():
     # Set specific loggers
     logging.getLogger("httpx").setLevel(logging.WARNING)
     logging.getLogger("urllib3").setLevel(logging.WARNING)
-
-# Run logging setup when module is imported
-setup_logging() 
\ No newline at end of file
@@ -4,7 +4,7 @@
 import json
 import asyncio
 from typing import Dict, List, Any, Optional, Union
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
 import logging
 from rich.console import Console
@@ -14,7 +14,7 @@ from .schema_analyzer import SchemaAnalyzer, SchemaAnalysis
 from .prompt_engineer import PromptEngineer, PromptStrategy
 from .output_parser import OutputParser, OutputValidator, ValidationLevel, ValidationResult
 from .llm_manager import LLMManager
-from .base_llm import GenerationConfig
+from .base_llm import GenerationConfig, LLMGenerationError
 
 logger = logging.getLogger(__name__)
 console = Console()
@@ -48,11 +48,17 @@ class GenerationResult:
     metadata: Dict[str, Any]
     errors: List[str]
 
+@dataclass
+class ProcessorConfig:
+    """Settings for splitting generation work into concurrent requests"""
+    batch_size: int = 4  # Records per call; 4 x 2000 tokens fits the 8000-token cap
+
 class JSONGenerationEngine:
     """Main engine for JSON data generation"""
     
-    def __init__(self, llm_manager: LLMManager):
+    def __init__(self, llm_manager: LLMManager, processor_config: Optional[ProcessorConfig] = None):
         self.llm_manager = llm_manager
+        self.processor_config = processor_config or ProcessorConfig()
         self.schema_analyzer = SchemaAnalyzer()
         self.prompt_engineer = PromptEngineer()
         self.output_parser = OutputParser()
@@ -62,6 +68,9 @@ class JSONGenerationEngine:
         """Generate JSON data based on request"""
         logger.info(f"Starting generation: {request.count} records for {request.context}")
         
+        # Serialize the schema once; the prompt builder and refinement prompt share it
+        schema_json = json.dumps(request.schema, indent=2)
+        
         try:
             # Step 1: Analyze schema
             with console.status("[bold blue]Analyzing schema..."):
@@ -71,25 +80,10 @@ class JSONGenerationEngine:
             
             # Step 2: Build prompt
             with console.status("[bold blue]Building optimized prompt..."):
-                # Determine if we should use multi-strategy based on complexity
-                use_multi = request.use_multi_strategy or (
-                    analysis.complexity_score > 0.5 and request.count > 5
-                )
-                
-                prompt = self.prompt_engineer.build_prompt(
-                    schema=request.schema,
-                    analysis=analysis,
-                    context=request.context,
-                    count=request.count,
-                    strategy=request.strategy,
-                    include_examples=request.include_examples,
-                    use_multi_strategy=use_multi
-                )
+                prompt = self._build_prompt(request, analysis, schema_json, request.count)
                 
-                # Optimize for selected model
                 model_type = request.model or self.llm_manager.default_model
-                prompt = self.prompt_engineer.optimize_for_model(prompt, model_type)
-                
+                use_multi = self._use_multi_strategy(request, analysis)
                 strategy_desc = "multi-strategy" if use_multi else request.strategy.value
                 console.print(f"[green]✓[/green] Prompt optimized for {model_type} using {strategy_desc}")
             
@@ -97,7 +91,8 @@ class JSONGenerationEngine:
             generated_data = await self._generate_with_mode(
                 prompt=prompt,
                 request=request,
-                analysis=analysis
+                analysis=analysis,
+                schema_json=schema_json
             )
             
             if not generated_data:
@@ -189,7 +184,8 @@ class JSONGenerationEngine:
         self,
         prompt: str,
         request: GenerationRequest,
-        analysis: SchemaAnalysis
+        analysis: SchemaAnalysis,
+        schema_json: str
     ) -> Optional[str]:
         """Generate data based on mode"""
         config = GenerationConfig(
@@ -200,27 +196,23 @@ class JSONGenerationEngine:
         
         try:
             if request.mode == GenerationMode.SINGLE:
-                # Generate one at a time
-                results = []
-                for i in range(request.count):
-                    console.print(f"[cyan]Generating record {i+1}/{request.count}...[/cyan]")
-                    response = await self.llm_manager.generate(
-                        prompt.replace(f"{request.count} records", "1 record"),
-                        model=request.model,
-                        config=config
-                    )
-                    results.append(response.content)
-                return "[" + ",".join(results) + "]"
+                # Generate one record per call; the calls are independent, so
+                # run them together and let the manager's semaphore bound them
+                console.print(f"[cyan]Generating {request.count} records individually...[/cyan]")
+                single_prompt = self._build_prompt(request, analysis, schema_json, 1)
                 
-            elif request.mode == GenerationMode.BATCH:
-                # Generate all at once
-                console.print(f"[cyan]Generating {request.count} records in batch...[/cyan]")
-                response = await self.llm_manager.generate(
-                    prompt,
-                    model=request.model,
-                    config=config
+                responses = await asyncio.gather(
+                    *[
+                        self.llm_manager.generate(single_prompt, model=request.model, config=config)
+                        for _ in range(request.count)
+                    ],
+                    return_exceptions=True
                 )
-                return response.content
+                self._raise_failures(responses, "records")
+                return "[" + ",".join(response.content for response in responses) + "]"
+                
+            elif request.mode == GenerationMode.BATCH:
+                return await self._generate_sub_batches(prompt, request, analysis, schema_json, config)
                 
             elif request.mode == GenerationMode.PROGRESSIVE:
                 # Generate and refine
@@ -247,7 +239,7 @@ class JSONGenerationEngine:
                     refinement_prompt = self._build_refinement_prompt(
                         parse_result.data,
                         validation,
-                        request.schema
+                        schema_json
                     )
                     
                     refined_response = await self.llm_manager.generate(
@@ -259,10 +251,96 @@ class JSONGenerationEngine:
                 
                 return initial_response.content
                 
+        except LLMGenerationError:
+            # Carries the provider errors of failed calls up to the result
+            raise
         except Exception as e:
             logger.error(f"Generation failed: {e}")
             return None
     
+    def _raise_failures(self, results: List[Any], unit: str) -> None:
+        """Raise one error describing every failed call among concurrent results"""
+        failures = [result for result in results if isinstance(result, Exception)]
+        if failures:
+            details = "; ".join(str(failure) for failure in failures[:3])
+            raise LLMGenerationError(
+                f"{len(failures)} of {len(results)} {unit} failed: {details}"
+            )
+    
+    async def _generate_sub_batches(
+        self,
+        prompt: str,
+        request: GenerationRequest,
+        analysis: SchemaAnalysis,
+        schema_json: str,
+        config: GenerationConfig
+    ) -> Optional[str]:
+        """Generate a batch as concurrent sub-batches and merge the parsed records"""
+        batch_size = max(1, self.processor_config.batch_size)
+        sizes = [
+            min(batch_size, request.count - start)
+            for start in range(0, request.count, batch_size)
+        ]
+        console.print(
+            f"[cyan]Generating {request.count} records in {len(sizes)} "
+            f"batch{'es' if len(sizes) > 1 else ''}...[/cyan]"
+        )
+        
+        # The full prompt already asks for request.count records; every other
+        # sub-batch size gets its own prompt with that count built in
+        prompts = {request.count: prompt}
+        for size in sizes:
+            if size not in prompts:
+                prompts[size] = self._build_prompt(request, analysis, schema_json, size)
+        
+        # The manager's semaphore bounds how many sub-batches run at once
+        async def _run(size: int) -> List[Dict]:
+            response = await self.llm_manager.generate(
+                prompts[size],
+                model=request.model,
+                config=replace(config, max_tokens=min(2000 * size, 8000))
+            )
+            
+            parse_result = self.output_parser.parse(response.content, size)
+            if not parse_result.success:
+                errors = "; ".join(parse_result.errors) or "no JSON found"
+                raise LLMGenerationError(f"Unparseable output: {errors}")
+            data = parse_result.data
+            return data if isinstance(data, list) else [data]
+        
+        results = await asyncio.gather(*map(_run, sizes), return_exceptions=True)
+        self._raise_failures(results, "sub-batches")
+        return json.dumps([record for records in results for record in records])
+    
+    def _use_multi_strategy(self, request: GenerationRequest, analysis: SchemaAnalysis) -> bool:
+        """Decide whether to combine prompt strategies based on complexity"""
+        return request.use_multi_strategy or (
+            analysis.complexity_score > 0.5 and request.count > 5
+        )
+    
+    def _build_prompt(
+        self,
+        request: GenerationRequest,
+        analysis: SchemaAnalysis,
+        schema_json: str,
+        count: int
+    ) -> str:
+        """Build a model-optimized prompt asking for count records"""
+        prompt = self.prompt_engineer.build_prompt(
+            schema=request.schema,
+            analysis=analysis,
+            context=request.context,
+            count=count,
+            strategy=request.strategy,
+            include_examples=request.include_examples,
+            use_multi_strategy=self._use_multi_strategy(request, analysis),
+            schema_json=schema_json
+        )
+        
+        # Optimize for selected model
+        model_type = request.model or self.llm_manager.default_model
+        return self.prompt_engineer.optimize_for_model(prompt, model_type)
+    
     def _get_validator(self, analysis: SchemaAnalysis) -> OutputValidator:
         """Get or create validator for schema"""
         # Cache validators by schema hash
@@ -277,7 +355,7 @@ class JSONGenerationEngine:
         self,
         data: Union[Dict, List[Dict]],
         validation: ValidationResult,
-        schema: Dict
+        schema_json: str
     ) -> str:
         """Build prompt to refine generated data"""
         issues = "\n".join(f"- {error}" for error in validation.errors[:5])
@@ -294,7 +372,7 @@ Issues found:
 Please fix these issues while maintaining the overall structure and realism of the data.
 The corrected data should follow this schema:
 ```json
-{json.dumps(schema, indent=2)}
+{schema_json}
 ```
 
 Return only the corrected JSON data."""
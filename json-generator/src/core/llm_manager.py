@@ -1,17 +1,24 @@
 """Unified LLM Manager for handling multiple providers"""
 
 import logging
-from typing import Dict, Optional, List, Any
+from typing import AsyncGenerator, Dict, Optional, List, Any
 from enum import Enum
+from dataclasses import replace
 import asyncio
+import copy
+import time
+import aiohttp
+import httpx
 from rich.console import Console
 from rich.table import Table
 
-from .base_llm import BaseLLM, LLMProvider, GenerationConfig, LLMResponse
+from .base_llm import (
+    BaseLLM, LLMProvider, GenerationConfig, LLMResponse, make_cache_key
+)
 from .llm_providers.openai_llm import OpenAILLM
 from .llm_providers.ollama_llm import OllamaLLM
 # from .llm_providers.local_llm import LocalLLM
-from .config import settings
+from .config import settings, configure_logging
 
 logger = logging.getLogger(__name__)
 console = Console()
@@ -26,16 +33,35 @@ class ModelPriority(Enum):
 class LLMManager:
     """Manages multiple LLM providers with fallback support"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
         self.models: Dict[str, BaseLLM] = {}
+        self._session = session
+        self._http_client = http_client
         self.default_model: Optional[str] = None
         self._initialized = False
+        self._init_lock = asyncio.Lock()
+        # Caps in-flight provider calls so parallel callers don't trip rate limits
+        self._semaphore = asyncio.Semaphore(settings.llm.max_concurrent_requests)
+        # Requests currently being generated, keyed by make_cache_key
+        self._inflight: Dict[str, asyncio.Task] = {}
         
     async def initialize(self):
         """Initialize all configured LLMs"""
         if self._initialized:
             return
         
+        # Concurrent callers share a single initialization pass
+        async with self._init_lock:
+            if self._initialized:
+                return
+            await self._initialize_providers()
+    
+    async def _initialize_providers(self):
+        """Probe every provider and record the ones that are usable"""
         console.print("[bold blue]Initializing LLM Manager...[/bold blue]")
         
         # Try to initialize each provider
@@ -72,7 +98,7 @@ class LLMManager:
                 logger.warning("OpenAI API key not configured")
                 return False
             
-            llm = OpenAILLM()
+            llm = OpenAILLM(http_client=self._http_client)
             await llm.initialize()
             
             self.models["openai"] = llm
@@ -85,8 +111,8 @@ class LLMManager:
     
     async def _init_ollama(self) -> bool:
         """Initialize Ollama provider"""
+        llm = OllamaLLM(session=self._session)
         try:
-            llm = OllamaLLM()
             await llm.initialize()
             
             self.models["ollama"] = llm
@@ -95,6 +121,7 @@ class LLMManager:
             
         except Exception as e:
             logger.error(f"Ollama initialization failed: {e}")
+            await llm.close()
             return False
     
     async def _init_local(self) -> bool:
@@ -172,23 +199,42 @@ class LLMManager:
         prompt: str,
         model: Optional[str] = None,
         config: Optional[GenerationConfig] = None,
-        fallback: bool = True
+        fallback: bool = True,
+        coalesce: bool = False
     ) -> LLMResponse:
         """Generate response with automatic fallback"""
         
         if not self._initialized:
             await self.initialize()
         
-        # Use specified model or default
-        model_name = model or self.default_model
+        model_name = self._resolve_model(model)
         
-        if not model_name or model_name not in self.models:
-            raise ValueError(f"Model '{model_name}' not available")
+        # Each call is an independent sample unless the caller opts in to sharing
+        # one in-flight request between identical concurrent calls
+        if not coalesce:
+            return await self._generate(prompt, model_name, config, fallback)
         
+        key = make_cache_key(
+            model_name, self.models[model_name].model_name, prompt, config,
+            kind="text", fallback=fallback
+        )
+        return await self._single_flight(
+            key, lambda: self._generate(prompt, model_name, config, fallback)
+        )
+    
+    async def _generate(
+        self,
+        prompt: str,
+        model_name: str,
+        config: Optional[GenerationConfig],
+        fallback: bool
+    ) -> LLMResponse:
+        """Generate with the given model, falling back to others on failure"""
         # Try primary model
         try:
             llm = self.models[model_name]
-            response = await llm.generate(prompt, config)
+            async with self._semaphore:
+                response = await llm.generate(prompt, config)
             return response
             
         except Exception as e:
@@ -205,11 +251,13 @@ class LLMManager:
                     try:
                         logger.info(f"Trying fallback model: {fallback_model}")
                         llm = self.models[fallback_model]
-                        response = await llm.generate(prompt, config)
-                        response.metadata = response.metadata or {}
-                        response.metadata["fallback_used"] = True
-                        response.metadata["original_model"] = model_name
-                        return response
+                        async with self._semaphore:
+                            response = await llm.generate(prompt, config)
+                        return replace(response, metadata={
+                            **(response.metadata or {}),
+                            "fallback_used": True,
+                            "original_model": model_name
+                        })
                         
                     except Exception as e:
                         logger.error(f"Fallback {fallback_model} also failed: {e}")
@@ -217,21 +265,157 @@ class LLMManager:
             
             raise Exception("All models failed to generate response")
     
+    async def generate_stream(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        config: Optional[GenerationConfig] = None,
+        usage: Optional[Dict[str, int]] = None
+    ) -> AsyncGenerator[str, None]:
+        """Stream a response chunk by chunk (no fallback once streaming starts)"""
+        if not self._initialized:
+            await self.initialize()
+        
+        model_name = self._resolve_model(model)
+        
+        async with self._semaphore:
+            async for chunk in self.models[model_name].generate_stream(prompt, config, usage):
+                yield chunk
+    
     async def generate_json(
         self,
         prompt: str,
         schema: Optional[Dict] = None,
         model: Optional[str] = None,
-        config: Optional[GenerationConfig] = None
+        config: Optional[GenerationConfig] = None,
+        coalesce: bool = False
     ) -> Dict:
         """Generate JSON response"""
         if not self._initialized:
             await self.initialize()
         
-        model_name = model or self.default_model
+        model_name = self._resolve_model(model)
         llm = self.models[model_name]
         
-        return await llm.generate_json(prompt, schema, config)
+        if not coalesce:
+            return await self._generate_json(llm, prompt, schema, config)
+        
+        key = make_cache_key(
+            model_name, llm.model_name, prompt, config, kind="json", schema=schema
+        )
+        result = await self._single_flight(
+            key, lambda: self._generate_json(llm, prompt, schema, config)
+        )
+        # Coalesced callers share one parsed object; give each its own copy
+        return copy.deepcopy(result)
+    
+    async def _generate_json(
+        self,
+        llm: BaseLLM,
+        prompt: str,
+        schema: Optional[Dict],
+        config: Optional[GenerationConfig]
+    ) -> Dict:
+        """Generate JSON with a single model under the concurrency limit"""
+        async with self._semaphore:
+            return await llm.generate_json(prompt, schema, config)
+    
+    def _resolve_model(self, model: Optional[str]) -> str:
+        """Return the name of the requested model, or the default one"""
+        # Use specified model or default
+        model_name = model or self.default_model
+        
+        if not model_name or model_name not in self.models:
+            raise ValueError(f"Model '{model_name}' not available")
+        return model_name
+    
+    async def _single_flight(self, key: str, factory) -> Any:
+        """Run factory() once per key, sharing the result with concurrent callers"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            
+            def _done(t: asyncio.Task):
+                self._inflight.pop(key, None)
+                # Mark the exception as retrieved if every waiter went away
+                if not t.cancelled():
+                    t.exception()
+            
+            task.add_done_callback(_done)
+        
+        # Shield so one cancelled caller doesn't cancel the shared request
+        return await asyncio.shield(task)
+    
+    async def warmup(self, model: Optional[str] = None) -> None:
+        """Send a one-token request so the model is loaded before real prompts arrive"""
+        if not self._initialized:
+            await self.initialize()
+        
+        model_name = model or self.default_model
+        if model_name not in self.models:
+            return
+        
+        try:
+            async with self._semaphore:
+                await self.models[model_name].generate("Hi", GenerationConfig(max_tokens=1))
+        except Exception as e:
+            logger.debug(f"Warmup of {model_name} failed: {e}")
+    
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        model: Optional[str] = None,
+        config: Optional[GenerationConfig] = None,
+        fallback: bool = True
+    ) -> List[LLMResponse]:
+        """Generate responses for several prompts concurrently; failures are returned as exceptions"""
+        return await asyncio.gather(
+            *(self.generate(prompt, model=model, config=config, fallback=fallback) for prompt in prompts),
+            return_exceptions=True
+        )
+    
+    async def generate_json_batch(
+        self,
+        prompts: List[str],
+        schema: Optional[Dict] = None,
+        model: Optional[str] = None,
+        config: Optional[GenerationConfig] = None,
+        fallback: bool = True
+    ) -> List[Dict]:
+        """Generate JSON for several prompts, several per request; failures are returned as exceptions"""
+        if not self._initialized:
+            await self.initialize()
+        
+        model_name = self._resolve_model(model)
+        
+        # The provider packs prompts into json_batch_size requests, each one
+        # bounded by its own semaphore
+        async with self._semaphore:
+            results = await self.models[model_name].generate_json_batch(
+                prompts, schema, config
+            )
+        if not fallback:
+            return results
+        
+        # Retry only the failed prompts, one fallback model at a time
+        for fallback_model in self._get_fallback_order(model_name):
+            failed = [
+                i for i, result in enumerate(results) if isinstance(result, Exception)
+            ]
+            if not failed:
+                break
+            if fallback_model not in self.models:
+                continue
+            
+            logger.info(f"Retrying {len(failed)} JSON prompts with {fallback_model}")
+            async with self._semaphore:
+                retried = await self.models[fallback_model].generate_json_batch(
+                    [prompts[i] for i in failed], schema, config
+                )
+            for i, result in zip(failed, retried):
+                results[i] = result
+        return results
     
     def _get_fallback_order(self, primary_model: str) -> List[str]:
         """Get fallback order for a given model"""
@@ -286,12 +470,11 @@ class LLMManager:
         
         for model_name, llm in self.models.items():
             try:
-                import time
-                start_time = time.time()
+                start_time = time.perf_counter()
                 
                 response = await llm.generate(test_prompt)
                 
-                end_time = time.time()
+                end_time = time.perf_counter()
                 
                 results[model_name] = {
                     "success": True,
@@ -322,38 +505,93 @@ class LLMManager:
                 return {"error": f"Model '{model}' not found"}
         else:
             return {name: llm.info for name, llm in self.models.items()}
+    
+    async def close(self):
+        """Close the network resources held by every provider"""
+        await asyncio.gather(*(llm.close() for llm in self.models.values()))
+    
+    async def __aenter__(self) -> "LLMManager":
+        await self.initialize()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+_shared_manager: Optional[LLMManager] = None
 
+async def get_manager(
+    session: Optional[aiohttp.ClientSession] = None,
+    http_client: Optional[httpx.AsyncClient] = None
+) -> LLMManager:
+    """Return the process-wide LLMManager, initializing it on first use
+
+    The clients are only used when the manager is created; passing different
+    ones to a later call raises ValueError instead of being silently ignored.
+    """
+    global _shared_manager
+    if _shared_manager is None:
+        _shared_manager = LLMManager(session=session, http_client=http_client)
+    elif (
+        (session is not None and session is not _shared_manager._session)
+        or (http_client is not None and http_client is not _shared_manager._http_client)
+    ):
+        raise ValueError(
+            "The shared LLMManager already uses other clients; "
+            "call close_manager() first"
+        )
+    
+    manager = _shared_manager
+    try:
+        await manager.initialize()
+    except Exception:
+        # Don't hand a manager that failed to initialize to later callers
+        if _shared_manager is manager:
+            _shared_manager = None
+        await manager.close()
+        raise
+    return manager
+
+async def close_manager() -> None:
+    """Close the process-wide LLMManager; the next get_manager starts a fresh one"""
+    global _shared_manager
+    if _shared_manager is not None:
+        manager, _shared_manager = _shared_manager, None
+        await manager.close()
 
 # Convenience function for testing
 async def test_llm_manager():
     """Test the LLM manager with all providers"""
-    manager = LLMManager()
-    await manager.initialize()
-    
-    # Test generation with each model
-    test_prompt = "Write a haiku about artificial intelligence"
-    
-    console.print("\n[bold]Testing all models:[/bold]")
-    
-    for model in manager.available_models:
-        try:
-            console.print(f"\n[yellow]Testing {model}:[/yellow]")
-            response = await manager.generate(test_prompt, model=model)
-            console.print(f"[green]Response:[/green] {response.content}")
-            console.print(f"[blue]Tokens:[/blue] {response.usage}")
-        except Exception as e:
-            console.print(f"[red]Error:[/red] {e}")
-    
-    # Test fallback
-    console.print("\n[bold]Testing fallback mechanism:[/bold]")
-    response = await manager.generate(
-        "What is 2+2?",
-        model="nonexistent",
-        fallback=True
-    )
-    console.print(f"[green]Fallback response:[/green] {response.content}")
-    console.print(f"[blue]Used model:[/blue] {response.model}")
+    try:
+        manager = await get_manager()
+        
+        # Test generation with each model
+        test_prompt = "Write a haiku about artificial intelligence"
+        
+        console.print("\n[bold]Testing all models:[/bold]")
+        
+        for model in manager.available_models:
+            try:
+                console.print(f"\n[yellow]Testing {model}:[/yellow]")
+                response = await manager.generate(test_prompt, model=model)
+                console.print(f"[green]Response:[/green] {response.content}")
+                console.print(f"[blue]Tokens:[/blue] {response.usage}")
+            except Exception as e:
+                console.print(f"[red]Error:[/red] {e}")
+        
+        # Test fallback
+        console.print("\n[bold]Testing fallback mechanism:[/bold]")
+        response = await manager.generate(
+            "What is 2+2?",
+            model="nonexistent",
+            fallback=True
+        )
+        console.print(f"[green]Fallback response:[/green] {response.content}")
+        console.print(f"[blue]Used model:[/blue] {response.model}")
+    finally:
+        await close_manager()
 
 if __name__ == "__main__":
     # Run test when module is executed directly
+    configure_logging()
     asyncio.run(test_llm_manager()) 
\ No newline at end of file
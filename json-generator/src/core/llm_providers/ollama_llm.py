@@ -15,12 +15,33 @@ logger = logging.getLogger(__name__)
 class OllamaLLM(BaseLLM):
     """Ollama implementation for locally hosted models"""
     
-    def __init__(self, model_name: Optional[str] = None, host: Optional[str] = None):
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        host: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None
+    ):
         model_name = model_name or settings.llm.ollama_model
-        super().__init__(model_name, LLMProvider.OLLAMA)
+        super().__init__(model_name, LLMProvider.OLLAMA, settings.llm.ollama_num_parallel)
         self.host = host or settings.llm.ollama_host
         self.timeout = settings.llm.ollama_timeout
         self._available_models = []
+        # A caller-supplied session is shared and never closed here
+        self._session = session
+        self._owns_session = session is None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled HTTP session, creating one on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+            self._owns_session = True
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the HTTP session if this instance created it"""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
         
     async def _initialize(self) -> None:
         """Initialize Ollama connection"""
@@ -55,21 +76,21 @@ class OllamaLLM(BaseLLM):
     async def _check_ollama_status(self) -> bool:
         """Check if Ollama server is running"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = urljoin(self.host, "/api/tags")
-                async with session.get(url, timeout=5) as response:
-                    return response.status == 200
+            session = self._get_session()
+            url = urljoin(self.host, "/api/tags")
+            async with session.get(url, timeout=5) as response:
+                return response.status == 200
         except:
             return False
     
     async def _list_models(self) -> List[Dict[str, Any]]:
         """List available models in Ollama"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = urljoin(self.host, "/api/tags")
-                async with session.get(url) as response:
-                    data = await response.json()
-                    return data.get("models", [])
+            session = self._get_session()
+            url = urljoin(self.host, "/api/tags")
+            async with session.get(url) as response:
+                data = await response.json()
+                return data.get("models", [])
         except Exception as e:
             logger.error(f"Failed to list Ollama models: {e}")
             return []
@@ -77,16 +98,16 @@ class OllamaLLM(BaseLLM):
     async def _pull_model(self, model_name: str) -> None:
         """Pull a model from Ollama registry"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = urljoin(self.host, "/api/pull")
-                data = {"name": model_name, "stream": False}
+            session = self._get_session()
+            url = urljoin(self.host, "/api/pull")
+            data = {"name": model_name, "stream": False}
+            
+            async with session.post(url, json=data, timeout=600) as response:
+                if response.status != 200:
+                    raise Exception(f"Failed to pull model: {await response.text()}")
+                
+                logger.info(f"Successfully pulled model: {model_name}")
                 
-                async with session.post(url, json=data, timeout=600) as response:
-                    if response.status != 200:
-                        raise Exception(f"Failed to pull model: {await response.text()}")
-                    
-                    logger.info(f"Successfully pulled model: {model_name}")
-                    
         except Exception as e:
             logger.error(f"Failed to pull model {model_name}: {e}")
             raise
@@ -95,18 +116,18 @@ class OllamaLLM(BaseLLM):
         """Test Ollama connection"""
         try:
             # Try a simple generation
-            async with aiohttp.ClientSession() as session:
-                url = urljoin(self.host, "/api/generate")
-                data = {
-                    "model": self.model_name,
-                    "prompt": "Hi",
-                    "stream": False,
-                    "options": {"num_predict": 5}
-                }
+            session = self._get_session()
+            url = urljoin(self.host, "/api/generate")
+            data = {
+                "model": self.model_name,
+                "prompt": "Hi",
+                "stream": False,
+                "options": {"num_predict": 5}
+            }
+            
+            async with session.post(url, json=data, timeout=30) as response:
+                return response.status == 200
                 
-                async with session.post(url, json=data, timeout=30) as response:
-                    return response.status == 200
-                    
         except Exception as e:
             logger.error(f"Ollama connection test failed: {e}")
             return False
@@ -123,56 +144,56 @@ class OllamaLLM(BaseLLM):
         config = config or GenerationConfig()
         
         try:
-            async with aiohttp.ClientSession() as session:
-                url = urljoin(self.host, "/api/generate")
+            session = self._get_session()
+            url = urljoin(self.host, "/api/generate")
                 
-                # Prepare request
-                data = {
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": config.temperature,
-                        "num_predict": config.max_tokens,
-                        "top_p": config.top_p,
-                        "stop": config.stop_sequences or []
-                    }
+            # Prepare request
+            data = {
+                "model": self.model_name,
+                "prompt": prompt,
+                "stream": False,
+                "options": {
+                    "temperature": config.temperature,
+                    "num_predict": config.max_tokens,
+                    "top_p": config.top_p,
+                    "stop": config.stop_sequences or []
                 }
+            }
                 
-                # Add JSON formatting if requested
-                if config.response_format == "json":
-                    data["format"] = "json"
+            # Add JSON formatting if requested
+            if config.response_format == "json":
+                data["format"] = "json"
                 
-                # Make request
-                async with session.post(
-                    url, 
-                    json=data, 
-                    timeout=self.timeout
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        raise LLMGenerationError(f"Ollama error: {error_text}")
+            # Make request
+            async with self._semaphore, session.post(
+                url, 
+                json=data, 
+                timeout=self.timeout
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    raise LLMGenerationError(f"Ollama error: {error_text}")
                     
-                    result = await response.json()
+                result = await response.json()
                     
-                    return LLMResponse(
-                        content=result["response"],
-                        model=self.model_name,
-                        provider=self.provider,
-                        usage={
-                            "prompt_tokens": result.get("prompt_eval_count", 0),
-                            "completion_tokens": result.get("eval_count", 0),
-                            "total_tokens": (
-                                result.get("prompt_eval_count", 0) + 
-                                result.get("eval_count", 0)
-                            )
-                        },
-                        metadata={
-                            "total_duration": result.get("total_duration"),
-                            "load_duration": result.get("load_duration"),
-                            "eval_duration": result.get("eval_duration")
-                        }
-                    )
+                return LLMResponse(
+                    content=result["response"],
+                    model=self.model_name,
+                    provider=self.provider,
+                    usage={
+                        "prompt_tokens": result.get("prompt_eval_count", 0),
+                        "completion_tokens": result.get("eval_count", 0),
+                        "total_tokens": (
+                            result.get("prompt_eval_count", 0) + 
+                            result.get("eval_count", 0)
+                        )
+                    },
+                    metadata={
+                        "total_duration": result.get("total_duration"),
+                        "load_duration": result.get("load_duration"),
+                        "eval_duration": result.get("eval_duration")
+                    }
+                )
                     
         except aiohttp.ClientError as e:
             logger.error(f"Ollama request failed: {e}")
@@ -184,7 +205,8 @@ class OllamaLLM(BaseLLM):
     async def generate_stream(
         self, 
         prompt: str, 
-        config: Optional[GenerationConfig] = None
+        config: Optional[GenerationConfig] = None,
+        usage: Optional[Dict[str, int]] = None
     ) -> AsyncGenerator[str, None]:
         """Generate streaming response"""
         if not self._is_initialized:
@@ -193,29 +215,42 @@ class OllamaLLM(BaseLLM):
         config = config or GenerationConfig()
         
         try:
-            async with aiohttp.ClientSession() as session:
-                url = urljoin(self.host, "/api/generate")
+            session = self._get_session()
+            url = urljoin(self.host, "/api/generate")
                 
-                data = {
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "stream": True,
-                    "options": {
-                        "temperature": config.temperature,
-                        "num_predict": config.max_tokens,
-                        "top_p": config.top_p
-                    }
+            data = {
+                "model": self.model_name,
+                "prompt": prompt,
+                "stream": True,
+                "options": {
+                    "temperature": config.temperature,
+                    "num_predict": config.max_tokens,
+                    "top_p": config.top_p
                 }
+            }
+            
+            # Add JSON formatting if requested
+            if config.response_format == "json":
+                data["format"] = "json"
                 
-                async with session.post(url, json=data) as response:
-                    async for line in response.content:
-                        if line:
-                            try:
-                                chunk = json.loads(line)
-                                if "response" in chunk:
-                                    yield chunk["response"]
-                            except json.JSONDecodeError:
-                                continue
+            async with self._semaphore, session.post(url, json=data) as response:
+                async for line in response.content:
+                    if line:
+                        try:
+                            chunk = json.loads(line)
+                            if "response" in chunk:
+                                yield chunk["response"]
+                            # The final chunk carries the token counts
+                            if chunk.get("done") and usage is not None:
+                                prompt_tokens = chunk.get("prompt_eval_count", 0)
+                                completion_tokens = chunk.get("eval_count", 0)
+                                usage.update({
+                                    "prompt_tokens": prompt_tokens,
+                                    "completion_tokens": completion_tokens,
+                                    "total_tokens": prompt_tokens + completion_tokens
+                                })
+                        except json.JSONDecodeError:
+                            continue
                                 
         except Exception as e:
             logger.error(f"Streaming generation failed: {e}")
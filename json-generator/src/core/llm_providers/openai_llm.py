@@ -2,6 +2,7 @@
 
 import logging
 from typing import Optional, AsyncGenerator, Dict
+import httpx
 import openai
 from openai import AsyncOpenAI
 import tiktoken
@@ -15,11 +16,17 @@ logger = logging.getLogger(__name__)
 class OpenAILLM(BaseLLM):
     """OpenAI API implementation"""
     
-    def __init__(self, model_name: Optional[str] = None):
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
         model_name = model_name or settings.llm.openai_model
         super().__init__(model_name, LLMProvider.OPENAI)
         self.client: Optional[AsyncOpenAI] = None
         self.tokenizer = None
+        # A caller-supplied client is shared and never closed here
+        self._http_client = http_client
         
     async def _initialize(self) -> None:
         """Initialize OpenAI client"""
@@ -27,7 +34,10 @@ class OpenAILLM(BaseLLM):
             if not settings.llm.openai_api_key:
                 raise LLMConnectionError("OpenAI API key not configured")
             
-            self.client = AsyncOpenAI(api_key=settings.llm.openai_api_key)
+            self.client = AsyncOpenAI(
+                api_key=settings.llm.openai_api_key,
+                http_client=self._http_client
+            )
             
             # Initialize tokenizer for token counting
             try:
@@ -45,6 +55,12 @@ class OpenAILLM(BaseLLM):
             logger.error(f"Failed to initialize OpenAI: {e}")
             raise LLMConnectionError(f"OpenAI initialization failed: {e}")
     
+    async def close(self) -> None:
+        """Close the API client if this instance created its HTTP pool"""
+        if self.client is not None and self._http_client is None:
+            await self.client.close()
+        self.client = None
+    
     async def test_connection(self) -> bool:
         """Test OpenAI API connection"""
         try:
@@ -90,7 +106,8 @@ class OpenAILLM(BaseLLM):
                 request_params["response_format"] = {"type": "json_object"}
             
             # Make API call
-            response = await self.client.chat.completions.create(**request_params)
+            async with self._semaphore:
+                response = await self.client.chat.completions.create(**request_params)
             
             # Extract response
             message = response.choices[0].message
@@ -121,7 +138,8 @@ class OpenAILLM(BaseLLM):
     async def generate_stream(
         self, 
         prompt: str, 
-        config: Optional[GenerationConfig] = None
+        config: Optional[GenerationConfig] = None,
+        usage: Optional[Dict[str, int]] = None
     ) -> AsyncGenerator[str, None]:
         """Generate streaming response"""
         if not self._is_initialized:
@@ -130,17 +148,36 @@ class OpenAILLM(BaseLLM):
         config = config or GenerationConfig()
         
         try:
-            stream = await self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=config.temperature,
-                max_tokens=config.max_tokens,
-                stream=True
-            )
+            request_params = {
+                "model": self.model_name,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": config.temperature,
+                "max_tokens": config.max_tokens,
+                "stream": True,
+            }
+            
+            # Add JSON mode if requested
+            if config.response_format == "json":
+                request_params["response_format"] = {"type": "json_object"}
+            
+            parts = []
+            async with self._semaphore:
+                stream = await self.client.chat.completions.create(**request_params)
+                
+                async for chunk in stream:
+                    if chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
             
-            async for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+            # The pinned SDK doesn't report usage for streams, so count locally
+            if usage is not None:
+                prompt_tokens = self.count_tokens(prompt)
+                completion_tokens = self.count_tokens("".join(parts))
+                usage.update({
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                })
                     
         except Exception as e:
             logger.error(f"Streaming generation failed: {e}")
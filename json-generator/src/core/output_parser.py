@@ -67,6 +67,15 @@ class OutputParser:
                             errors=[],
                             extraction_method=extractor.__name__
                         )
+                    elif expected_count == 1 and isinstance(data, list) and len(data) == 1:
+                        # Templates ask for an array even for one record - unwrap it
+                        return ParseResult(
+                            success=True,
+                            data=data[0],
+                            raw_text=llm_output,
+                            errors=[],
+                            extraction_method=extractor.__name__
+                        )
                     elif expected_count > 1 and isinstance(data, list):
                         if len(data) == expected_count:
                             return ParseResult(
@@ -226,7 +226,8 @@ Following all the above guidelines:"""
         count: int = 10,
         strategy: PromptStrategy = PromptStrategy.CHAIN_OF_THOUGHT,
         include_examples: bool = True,
-        use_multi_strategy: bool = False
+        use_multi_strategy: bool = False,
+        schema_json: Optional[str] = None
     ) -> str:
         """Build optimized prompt for JSON generation
         
@@ -238,8 +239,12 @@ Following all the above guidelines:"""
             strategy: Single strategy to use (if not multi-strategy)
             include_examples: Whether to include examples
             use_multi_strategy: Whether to use multiple strategies
+            schema_json: Pre-serialized schema, reused instead of calling json.dumps
         """
         
+        if schema_json is None:
+            schema_json = json.dumps(schema, indent=2)
+        
         # Get components
         components = self._analyze_requirements(schema, analysis, context, count)
         
@@ -251,13 +256,13 @@ Following all the above guidelines:"""
         
         # Otherwise use single strategy (backward compatible)
         if strategy == PromptStrategy.FEW_SHOT and include_examples:
-            return self._build_few_shot_prompt(components, schema, context, count)
+            return self._build_few_shot_prompt(components, schema_json, context, count)
         elif strategy == PromptStrategy.CHAIN_OF_THOUGHT:
-            return self._build_cot_prompt(components, schema, analysis, context, count)
+            return self._build_cot_prompt(components, schema_json, analysis, context, count)
         elif strategy == PromptStrategy.STRUCTURED:
-            return self._build_structured_prompt(components, schema, analysis, context, count)
+            return self._build_structured_prompt(components, schema_json, analysis, context, count)
         else:
-            return self._build_zero_shot_prompt(components, schema, context, count)
+            return self._build_zero_shot_prompt(components, schema_json, context, count)
     
     def _analyze_requirements(
         self,
@@ -413,7 +418,7 @@ Following all the above guidelines:"""
     def _build_few_shot_prompt(
         self,
         components: PromptComponents,
-        schema: Dict,
+        schema_json: str,
         context: str,
         count: int
     ) -> str:
@@ -429,7 +434,7 @@ Following all the above guidelines:"""
 
 {example_text}Now generate {count} similar records following this schema:
 ```json
-{json.dumps(schema, indent=2)}
+{schema_json}
 ```
 
 {components.schema_description}
@@ -449,7 +454,7 @@ Requirements:
     def _build_cot_prompt(
         self,
         components: PromptComponents,
-        schema: Dict,
+        schema_json: str,
         analysis: SchemaAnalysis,
         context: str,
         count: int
@@ -465,7 +470,7 @@ Requirements:
         
         return template.format(
             context=context,
-            schema=json.dumps(schema, indent=2),
+            schema=schema_json,
             count=count,
             analysis=analysis_summary
         )
@@ -473,7 +478,7 @@ Requirements:
     def _build_structured_prompt(
         self,
         components: PromptComponents,
-        schema: Dict,
+        schema_json: str,
         analysis: SchemaAnalysis,
         context: str,
         count: int
@@ -501,7 +506,7 @@ Requirements:
         template = self.strategy_templates[PromptStrategy.STRUCTURED]
         return template.format(
             context=context,
-            schema=json.dumps(schema, indent=2),
+            schema=schema_json,
             count=count,
             field_specs="\n\n".join(field_specs)
         )
@@ -509,7 +514,7 @@ Requirements:
     def _build_zero_shot_prompt(
         self,
         components: PromptComponents,
-        schema: Dict,
+        schema_json: str,
         context: str,
         count: int
     ) -> str:
@@ -520,7 +525,7 @@ Requirements:
         
         return template.format(
             context=context,
-            schema=json.dumps(schema, indent=2),
+            schema=schema_json,
             count=count,
             constraints=constraints_text
         )
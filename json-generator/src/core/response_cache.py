@@ -0,0 +1,202 @@
+"""On-disk response cache for repeated LLM prompts"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from .base_llm import GenerationConfig, LLMProvider, LLMResponse, make_cache_key
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """Exact-match cache that stores generation results as JSON files"""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        ttl: Optional[float] = 7 * 24 * 3600
+    ):
+        self.cache_dir = Path(cache_dir or settings.app.cache_dir / "llm")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        if self.ttl is not None and time.time() - entry.get("created", 0) > self.ttl:
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry.get("value")
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value under key"""
+        path = self._path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), "value": value}, f, default=str)
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {key}: {e}")
+
+    def clear(self) -> None:
+        """Remove every cached entry"""
+        for path in self.cache_dir.glob("*/*.json"):
+            path.unlink(missing_ok=True)
+
+class CachedLLMManager:
+    """LLMManager wrapper that serves repeated prompts from a ResponseCache
+
+    Cache reads and writes run in a worker thread so file I/O doesn't block
+    the event loop.
+    """
+
+    def __init__(self, manager, cache: Optional[ResponseCache] = None):
+        self.manager = manager
+        self.cache = cache or ResponseCache()
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything that is not cached is delegated to the wrapped manager
+        return getattr(self.manager, name)
+
+    def _key(
+        self,
+        kind: str,
+        prompt: str,
+        model: Optional[str],
+        config: Optional[GenerationConfig],
+        **extra
+    ) -> str:
+        model_name = model or self.manager.default_model
+        llm = self.manager.models.get(model_name)
+        provider = llm.provider.value if llm else str(model_name)
+        model_id = llm.model_name if llm else str(model_name)
+        return make_cache_key(provider, model_id, prompt, config, kind=kind, **extra)
+
+    async def generate(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        config: Optional[GenerationConfig] = None,
+        fallback: bool = True
+    ) -> LLMResponse:
+        """Generate a response, reusing a cached one when available"""
+        key = self._key("text", prompt, model, config)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            cached["provider"] = LLMProvider(cached["provider"])
+            return LLMResponse(**cached)
+
+        response = await self.manager.generate(
+            prompt, model=model, config=config, fallback=fallback
+        )
+        if (response.metadata or {}).get("fallback_used"):
+            # The key names the requested model, not the fallback that answered
+            return response
+
+        entry = asdict(response)
+        entry["provider"] = response.provider.value
+        await asyncio.to_thread(self.cache.set, key, entry)
+        return response
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        config: Optional[GenerationConfig] = None,
+        usage: Optional[Dict[str, int]] = None
+    ) -> AsyncGenerator[str, None]:
+        """Stream a response, replaying a cached one as a single chunk"""
+        key = self._key("text", prompt, model, config)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            if usage is not None and cached.get("usage"):
+                usage.update(cached["usage"])
+            yield cached["content"]
+            return
+
+        # Collect usage even when the caller didn't ask, so the cache entry has it
+        stream_usage = {} if usage is None else usage
+        parts = []
+        async for chunk in self.manager.generate_stream(
+            prompt, model=model, config=config, usage=stream_usage
+        ):
+            parts.append(chunk)
+            yield chunk
+
+        model_name = model or self.manager.default_model
+        llm = self.manager.models[model_name]
+        await asyncio.to_thread(self.cache.set, key, {
+            "content": "".join(parts),
+            "model": llm.model_name,
+            "provider": llm.provider.value,
+            "usage": dict(stream_usage) or None,
+            "metadata": {"streamed": True},
+        })
+
+    async def generate_json(
+        self,
+        prompt: str,
+        schema: Optional[Dict] = None,
+        model: Optional[str] = None,
+        config: Optional[GenerationConfig] = None
+    ) -> Dict:
+        """Generate JSON, reusing a cached result when available"""
+        key = self._key("json", prompt, model, config, schema=schema)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            return cached
+
+        result = await self.manager.generate_json(
+            prompt, schema=schema, model=model, config=config
+        )
+        if result:
+            # Empty results mean extraction failed; don't pin them in the cache
+            await asyncio.to_thread(self.cache.set, key, result)
+        return result
+
+    async def generate_json_batch(
+        self,
+        prompts: List[str],
+        schema: Optional[Dict] = None,
+        model: Optional[str] = None,
+        config: Optional[GenerationConfig] = None
+    ) -> List[Dict]:
+        """Generate JSON for several prompts, sending only the uncached ones"""
+        keys = [
+            self._key("json", prompt, model, config, schema=schema)
+            for prompt in prompts
+        ]
+        results = await asyncio.to_thread(lambda: [self.cache.get(key) for key in keys])
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            fresh = await self.manager.generate_json_batch(
+                [prompts[i] for i in missing], schema=schema, model=model, config=config
+            )
+            for i, result in zip(missing, fresh):
+                results[i] = result
+                if result and not isinstance(result, Exception):
+                    await asyncio.to_thread(self.cache.set, keys[i], result)
+        return results
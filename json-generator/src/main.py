@@ -3,6 +3,7 @@
 import asyncio
 from rich.console import Console
 from core.llm_manager import LLMManager
+from core.config import settings, configure_logging
 
 console = Console()
 
@@ -10,24 +11,24 @@ async def main():
     """Main application entry point"""
     console.print("[bold blue]JSON Generator - Week 1 Development[/bold blue]\n")
     
-    # Initialize LLM Manager
-    manager = LLMManager()
-    await manager.initialize()
-    
-    # Example usage
-    prompt = "Generate a simple JSON object with a greeting message"
-    response = await manager.generate(prompt)
-    
-    console.print("[green]Generated response:[/green]")
-    console.print(response.content)
-    
-    # Try JSON generation
-    json_response = await manager.generate_json(
-        "Create a user profile with name, email, and preferences"
-    )
-    
-    console.print("\n[green]Generated JSON:[/green]")
-    console.print_json(data=json_response)
+    # Initialize LLM Manager; leaving the block closes its provider clients
+    async with LLMManager() as manager:
+        # Example usage
+        prompt = "Generate a simple JSON object with a greeting message"
+        response = await manager.generate(prompt)
+        
+        console.print("[green]Generated response:[/green]")
+        console.print(response.content)
+        
+        # Try JSON generation
+        json_response = await manager.generate_json(
+            "Create a user profile with name, email, and preferences"
+        )
+        
+        console.print("\n[green]Generated JSON:[/green]")
+        console.print_json(data=json_response)
 
 if __name__ == "__main__":
+    configure_logging()
+    settings.ensure_dirs()
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""Test generation modes of the JSON generation engine"""
+
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("langchain")
+
+from src.core.base_llm import LLMGenerationError
+from src.core.generation_engine import (
+    GenerationMode,
+    GenerationRequest,
+    JSONGenerationEngine,
+    ProcessorConfig,
+)
+
+
+class StubPromptEngineer:
+    """Prompt engineer that renders the record count like the real templates"""
+    
+    def build_prompt(self, count, **kwargs):
+        return f"Generate {count} realistic JSON records for users."
+    
+    def optimize_for_model(self, prompt, model_type):
+        return prompt
+
+class StubManager:
+    """LLM manager that answers with exactly as many records as the prompt asks for"""
+    
+    default_model = "stub"
+    
+    def __init__(self, fail_calls=(), always_array=False):
+        self.requested = []
+        self.fail_calls = set(fail_calls)
+        self.always_array = always_array
+    
+    async def generate(self, prompt, model=None, config=None):
+        count = int(re.search(r"Generate (\d+) realistic", prompt).group(1))
+        self.requested.append(count)
+        if len(self.requested) in self.fail_calls:
+            raise RuntimeError("provider unavailable")
+        records = [{"id": len(self.requested) * 100 + i} for i in range(count)]
+        if count == 1 and not self.always_array:
+            records = records[0]
+        return SimpleNamespace(content=json.dumps(records))
+
+@pytest.fixture
+def engine():
+    """Engine wired to the stub manager and prompt engineer"""
+    config = ProcessorConfig(batch_size=4)
+    engine = JSONGenerationEngine(StubManager(), config)
+    engine.prompt_engineer = StubPromptEngineer()
+    return engine
+
+class TestBatchMode:
+    """Test splitting BATCH mode into sub-batches"""
+    
+    @pytest.mark.asyncio
+    async def test_sub_batches_merge_to_requested_count(self, engine):
+        """Test that each sub-batch asks for its own size and the records merge"""
+        request = GenerationRequest(schema={"id": 1}, context="users", count=10)
+        analysis = SimpleNamespace(complexity_score=0.1)
+        prompt = engine._build_prompt(request, analysis, "{}", request.count)
+        
+        output = await engine._generate_with_mode(prompt, request, analysis, "{}")
+        
+        assert sorted(engine.llm_manager.requested) == [2, 4, 4]
+        records = json.loads(output)
+        assert len(records) == 10
+        assert len({record["id"] for record in records}) == 10
+    
+    @pytest.mark.asyncio
+    async def test_small_batch_uses_single_call(self, engine):
+        """Test that a count within batch_size is sent as one request"""
+        request = GenerationRequest(schema={"id": 1}, context="users", count=3)
+        analysis = SimpleNamespace(complexity_score=0.1)
+        prompt = engine._build_prompt(request, analysis, "{}", request.count)
+        
+        output = await engine._generate_with_mode(prompt, request, analysis, "{}")
+        
+        assert engine.llm_manager.requested == [3]
+        assert len(json.loads(output)) == 3
+    
+    @pytest.mark.asyncio
+    async def test_single_record_sub_batch_accepts_array(self, engine):
+        """Test that a one-record sub-batch answered with a one-element array parses"""
+        engine.llm_manager.always_array = True
+        request = GenerationRequest(schema={"id": 1}, context="users", count=9)
+        analysis = SimpleNamespace(complexity_score=0.1)
+        prompt = engine._build_prompt(request, analysis, "{}", request.count)
+        
+        output = await engine._generate_with_mode(prompt, request, analysis, "{}")
+        
+        assert 1 in engine.llm_manager.requested
+        assert len(json.loads(output)) == 9
+    
+    @pytest.mark.asyncio
+    async def test_failed_sub_batch_raises_provider_error(self, engine):
+        """Test that a failed sub-batch is reported instead of silently dropped"""
+        engine.llm_manager.fail_calls = {1}
+        request = GenerationRequest(schema={"id": 1}, context="users", count=10)
+        analysis = SimpleNamespace(complexity_score=0.1)
+        prompt = engine._build_prompt(request, analysis, "{}", request.count)
+        
+        expected = "1 of 3 sub-batches failed: provider unavailable"
+        with pytest.raises(LLMGenerationError, match=expected):
+            await engine._generate_with_mode(prompt, request, analysis, "{}")
+
+class TestSingleMode:
+    """Test concurrent one-record-per-call generation"""
+    
+    @pytest.mark.asyncio
+    async def test_each_call_asks_for_one_record(self, engine):
+        """Test that SINGLE mode sends count one-record prompts"""
+        request = GenerationRequest(
+            schema={"id": 1}, context="users", count=5, mode=GenerationMode.SINGLE
+        )
+        analysis = SimpleNamespace(complexity_score=0.1)
+        prompt = engine._build_prompt(request, analysis, "{}", request.count)
+        
+        output = await engine._generate_with_mode(prompt, request, analysis, "{}")
+        
+        assert engine.llm_manager.requested == [1] * 5
+        assert len(json.loads(output)) == 5
+    
+    @pytest.mark.asyncio
+    async def test_failed_records_raise_provider_error(self, engine):
+        """Test that a failed call is reported instead of silently dropped"""
+        engine.llm_manager.fail_calls = {2}
+        request = GenerationRequest(
+            schema={"id": 1}, context="users", count=3, mode=GenerationMode.SINGLE
+        )
+        analysis = SimpleNamespace(complexity_score=0.1)
+        prompt = engine._build_prompt(request, analysis, "{}", request.count)
+        
+        expected = "1 of 3 records failed: provider unavailable"
+        with pytest.raises(LLMGenerationError, match=expected):
+            await engine._generate_with_mode(prompt, request, analysis, "{}")
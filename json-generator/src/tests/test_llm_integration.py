@@ -2,19 +2,73 @@
 
 import pytest
 import asyncio
+import json
 import os
+import re
 from pathlib import Path
 
+from src.core import llm_manager as llm_manager_module
 from src.core.llm_manager import LLMManager, ModelPriority
-from src.core.base_llm import GenerationConfig
+from src.core.base_llm import (
+    BaseLLM,
+    GenerationConfig,
+    LLMGenerationError,
+    LLMProvider,
+    LLMResponse,
+)
+from src.core.llm_providers.ollama_llm import OllamaLLM
 from src.core.config import settings
 
 # Test fixtures
 @pytest.fixture
 async def llm_manager():
     """Create and initialize LLM manager"""
+    async with LLMManager() as manager:
+        yield manager
+
+class FakeLLM(BaseLLM):
+    """Scripted provider for tests that need no real backend"""
+    
+    def __init__(self, reply=None, stream_chunks=(), max_concurrency=None, delay=0.0):
+        super().__init__("fake-model", LLMProvider.OLLAMA, max_concurrency)
+        self.reply = reply or (lambda prompt: "{}")
+        self.stream_chunks = list(stream_chunks)
+        self.delay = delay
+        self.prompts = []
+        self.closed = False
+    
+    async def _initialize(self):
+        pass
+    
+    async def generate(self, prompt, config=None):
+        async with self._semaphore:
+            self.prompts.append(prompt)
+            await asyncio.sleep(self.delay)
+            return LLMResponse(content=self.reply(prompt), model=self.model_name, provider=self.provider)
+    
+    async def generate_stream(self, prompt, config=None, usage=None):
+        async with self._semaphore:
+            for chunk in self.stream_chunks:
+                yield chunk
+    
+    async def test_connection(self):
+        return True
+    
+    async def close(self):
+        self.closed = True
+
+async def fake_providers(manager):
+    """Stand-in for LLMManager._initialize_providers that registers a FakeLLM"""
+    manager.models = {"fake": FakeLLM()}
+    manager.default_model = "fake"
+    manager._initialized = True
+
+def make_fake_manager(llm):
+    """Build an LLMManager that serves every request from llm"""
     manager = LLMManager()
-    await manager.initialize()
+    manager.models = {"fake": llm}
+    manager.default_model = "fake"
+    manager._initialized = True
     return manager
 
 # Basic connection tests
@@ -209,6 +263,245 @@ class TestIntegration:
         with pytest.raises(ValueError):
             await llm_manager.generate("test", model="invalid_model", fallback=False)
 
+# JSON extraction tests (no provider needed)
+class TestJSONExtraction:
+    """Test recovery of JSON from free-form model output"""
+    
+    def test_extract_fenced_json(self):
+        """Test extraction from a markdown code fence"""
+        llm = OllamaLLM()
+        text = 'Here you go:\n```json\n{"id": 1, "tags": ["a"]}\n```'
+        assert llm._extract_json(text) == {"id": 1, "tags": ["a"]}
+    
+    def test_extract_nested_json(self):
+        """Test extraction of nested objects with braces inside strings"""
+        llm = OllamaLLM()
+        text = 'Result: {"user": {"name": "a}b", "address": {"city": "X"}}} done'
+        assert llm._extract_json(text) == {"user": {"name": "a}b", "address": {"city": "X"}}}
+    
+    def test_extract_no_json(self):
+        """Test that text without JSON yields an empty dict"""
+        assert OllamaLLM()._extract_json("no json {here") == {}
+
+# JSON streaming tests (no provider needed)
+class TestJSONStreaming:
+    """Test incremental JSON parsing of streamed responses"""
+    
+    @pytest.mark.asyncio
+    async def test_fallback_releases_stream_slot(self):
+        """Test that falling back doesn't wait on the stream's own semaphore slot"""
+        pytest.importorskip("ijson")
+        llm = FakeLLM(reply=lambda prompt: '{"a": 1}', stream_chunks=["not json"], max_concurrency=1)
+        
+        async def collect():
+            return [item async for item in llm.generate_json_stream("prompt")]
+        
+        assert await asyncio.wait_for(collect(), timeout=2) == [("a", 1)]
+        assert not llm._semaphore.locked()
+    
+    @pytest.mark.asyncio
+    async def test_early_exit_closes_stream(self):
+        """Test that closing the generator early releases the provider slot"""
+        pytest.importorskip("ijson")
+        llm = FakeLLM(stream_chunks=['{"a": 1, ', '"b": 2}'], max_concurrency=1)
+        
+        pairs = llm.generate_json_stream("prompt")
+        assert await pairs.__anext__() == ("a", 1)
+        await pairs.aclose()
+        
+        assert not llm._semaphore.locked()
+    
+    @pytest.mark.asyncio
+    async def test_top_level_array_raises(self):
+        """Test that a streamed array is rejected instead of yielding nothing"""
+        pytest.importorskip("ijson")
+        llm = FakeLLM(stream_chunks=['[{"a": 1}', ', {"a": 2}]'], max_concurrency=1)
+        
+        with pytest.raises(LLMGenerationError, match="Expected a streamed JSON object"):
+            [item async for item in llm.generate_json_stream("prompt")]
+        assert not llm._semaphore.locked()
+
+def answer_inputs(prompt):
+    """Fake reply that echoes each prompt, wrapping packed prompts in an items list"""
+    inputs = re.findall(r"^Input \d+: (.*)$", prompt, re.MULTILINE)
+    if inputs:
+        return json.dumps({"items": [{"answer": text} for text in inputs]})
+    if "boom" in prompt:
+        raise RuntimeError("provider failed")
+    return json.dumps({"answer": prompt.split("\n")[0]})
+
+# Batched JSON tests (no provider needed)
+class TestJSONBatch:
+    """Test packing several JSON prompts into one request"""
+    
+    @pytest.mark.asyncio
+    async def test_items_are_unwrapped(self):
+        """Test that a packed response is split back into one result per prompt"""
+        llm = FakeLLM(reply=answer_inputs)
+        results = await llm.generate_json_batch(["a", "b", "c"], batch_size=3)
+        
+        assert results == [{"answer": "a"}, {"answer": "b"}, {"answer": "c"}]
+        assert len(llm.prompts) == 1
+    
+    @pytest.mark.asyncio
+    async def test_length_mismatch_falls_back_per_prompt(self):
+        """Test that a packed response with the wrong item count is retried individually"""
+        def reply(prompt):
+            if "Input 0:" in prompt:
+                return json.dumps({"items": [{"answer": "a"}]})
+            return answer_inputs(prompt)
+        
+        llm = FakeLLM(reply=reply)
+        results = await llm.generate_json_batch(["a", "b"], batch_size=2)
+        
+        assert results == [{"answer": "a"}, {"answer": "b"}]
+        assert len(llm.prompts) == 3
+    
+    @pytest.mark.asyncio
+    async def test_order_preserved_across_chunks(self):
+        """Test that results line up with prompts when spread over several requests"""
+        prompts = [f"prompt {i}" for i in range(settings.llm.json_batch_size * 2 + 1)]
+        manager = make_fake_manager(FakeLLM(reply=answer_inputs))
+        
+        results = await manager.generate_json_batch(prompts)
+        
+        assert results == [{"answer": prompt} for prompt in prompts]
+    
+    @pytest.mark.asyncio
+    async def test_failed_request_is_returned_in_place(self):
+        """Test that a failing request yields its exception without failing the batch"""
+        llm = FakeLLM(reply=answer_inputs)
+        results = await llm.generate_json_batch(["a", "boom"], batch_size=1)
+        
+        assert results[0] == {"answer": "a"}
+        assert isinstance(results[1], RuntimeError)
+    
+    @pytest.mark.asyncio
+    async def test_unknown_model_raises_value_error(self):
+        """Test that the manager rejects an unknown model like its other methods"""
+        manager = make_fake_manager(FakeLLM(reply=answer_inputs))
+        
+        with pytest.raises(ValueError, match="not available"):
+            await manager.generate_json_batch(["a"], model="missing")
+    
+    @pytest.mark.asyncio
+    async def test_failed_prompts_use_fallback_model(self):
+        """Test that prompts the primary model fails on are retried with a fallback"""
+        def fail(prompt):
+            raise RuntimeError("provider failed")
+        
+        manager = make_fake_manager(FakeLLM(reply=fail))
+        manager.models = {"openai": manager.models["fake"], "ollama": FakeLLM(reply=answer_inputs)}
+        
+        results = await manager.generate_json_batch(["a", "b"], model="openai")
+        
+        assert results == [{"answer": "a"}, {"answer": "b"}]
+        
+        results = await manager.generate_json_batch(["a"], model="openai", fallback=False)
+        assert isinstance(results[0], RuntimeError)
+
+# Request coalescing tests (no provider needed)
+class TestSingleFlight:
+    """Test that identical concurrent requests share one provider call"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_generate_calls_once(self):
+        """Test that N concurrent identical generate() calls make one provider call"""
+        llm = FakeLLM(reply=lambda prompt: "shared", delay=0.05)
+        manager = make_fake_manager(llm)
+        
+        responses = await asyncio.gather(
+            *[manager.generate("same prompt", coalesce=True) for _ in range(5)]
+        )
+        
+        assert len(llm.prompts) == 1
+        assert all(response.content == "shared" for response in responses)
+        assert not manager._inflight
+    
+    @pytest.mark.asyncio
+    async def test_distinct_prompts_are_not_coalesced(self):
+        """Test that different prompts each reach the provider"""
+        llm = FakeLLM(reply=lambda prompt: prompt, delay=0.05)
+        manager = make_fake_manager(llm)
+        
+        await asyncio.gather(
+            *[manager.generate(f"prompt {i}", coalesce=True) for i in range(3)]
+        )
+        
+        assert len(llm.prompts) == 3
+    
+    @pytest.mark.asyncio
+    async def test_identical_calls_are_independent_by_default(self):
+        """Test that identical calls without coalesce each get their own sample"""
+        llm = FakeLLM(delay=0.05)
+        manager = make_fake_manager(llm)
+        
+        await asyncio.gather(*[manager.generate("same prompt") for _ in range(3)])
+        await asyncio.gather(*[manager.generate_json("same prompt") for _ in range(2)])
+        
+        assert len(llm.prompts) == 5
+    
+    @pytest.mark.asyncio
+    async def test_coalesced_json_results_are_independent(self):
+        """Test that each waiter gets its own copy of a shared JSON result"""
+        llm = FakeLLM(reply=lambda prompt: '{"tags": ["a"]}', delay=0.05)
+        manager = make_fake_manager(llm)
+        
+        first, second = await asyncio.gather(
+            manager.generate_json("same prompt", coalesce=True),
+            manager.generate_json("same prompt", coalesce=True)
+        )
+        first["tags"].append("b")
+        
+        assert len(llm.prompts) == 1
+        assert second == {"tags": ["a"]}
+
+# Manager lifecycle tests (no provider needed)
+class TestManagerLifecycle:
+    """Test that the manager releases provider resources"""
+    
+    @pytest.mark.asyncio
+    async def test_context_manager_closes_providers(self):
+        """Test that leaving the async with block closes every provider"""
+        llm = FakeLLM()
+        async with make_fake_manager(llm) as manager:
+            assert manager.available_models == ["fake"]
+        assert llm.closed
+    
+    @pytest.mark.asyncio
+    async def test_shared_manager_rejects_other_clients(self, monkeypatch):
+        """Test that get_manager refuses clients it would otherwise ignore"""
+        monkeypatch.setattr(llm_manager_module, "_shared_manager", None)
+        monkeypatch.setattr(LLMManager, "_initialize_providers", fake_providers)
+        first, second = object(), object()
+        
+        manager = await llm_manager_module.get_manager(session=first)
+        assert await llm_manager_module.get_manager() is manager
+        assert await llm_manager_module.get_manager(session=first) is manager
+        with pytest.raises(ValueError, match="other clients"):
+            await llm_manager_module.get_manager(session=second)
+        
+        await llm_manager_module.close_manager()
+    
+    @pytest.mark.asyncio
+    async def test_failed_init_is_not_cached(self, monkeypatch):
+        """Test that a manager whose initialization failed is dropped"""
+        monkeypatch.setattr(llm_manager_module, "_shared_manager", None)
+        
+        async def no_providers(self):
+            raise RuntimeError("No LLM providers could be initialized!")
+        
+        monkeypatch.setattr(LLMManager, "_initialize_providers", no_providers)
+        with pytest.raises(RuntimeError):
+            await llm_manager_module.get_manager()
+        assert llm_manager_module._shared_manager is None
+        
+        monkeypatch.setattr(LLMManager, "_initialize_providers", fake_providers)
+        manager = await llm_manager_module.get_manager()
+        assert manager.available_models == ["fake"]
+        
+        await llm_manager_module.close_manager()
+
 # Validation script
 def run_validation():
     """Run validation script for Week 1"""
@@ -3,11 +3,14 @@
 
 import asyncio
 import json
+import time
 from pathlib import Path
 import sys
 
-# Add project root to path
-sys.path.append(str(Path(__file__).parent.parent.parent))
+# Add project root to path (once, even if this module is re-imported)
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 
 from src.core.llm_manager import LLMManager
 from src.core.generation_engine import JSONGenerationEngine, GenerationRequest, GenerationMode
@@ -23,245 +26,249 @@ async def test_multi_strategy():
     
     # Initialize components
     console.print("[bold blue]Initializing JSON Generator...[/bold blue]")
-    llm_manager = LLMManager()
-    await llm_manager.initialize()
-    
-    engine = JSONGenerationEngine(llm_manager)
-    analyzer = SchemaAnalyzer()
-    
-    # Test schemas of varying complexity
-    test_cases = [
-        {
-            "name": "Simple Schema",
-            "schema": {
-                "id": "123",
-                "name": "John Doe",
-                "age": 30,
-                "active": True
-            },
-            "context": "user profiles",
-            "count": 3
-        },
-        {
-            "name": "Medium Complexity",
-            "schema": {
-                "orderId": "ORD-2024-001",
-                "customer": {
-                    "id": "CUST-123",
-                    "email": "john@example.com"
+    async with LLMManager() as llm_manager:
+        engine = JSONGenerationEngine(llm_manager)
+        analyzer = SchemaAnalyzer()
+        
+        # Test schemas of varying complexity
+        test_cases = [
+            {
+                "name": "Simple Schema",
+                "schema": {
+                    "id": "123",
+                    "name": "John Doe",
+                    "age": 30,
+                    "active": True
                 },
-                "items": [
-                    {"productId": "PROD-1", "quantity": 2, "price": 29.99}
-                ],
-                "totalAmount": 59.98,
-                "orderDate": "2024-01-15"
+                "context": "user profiles",
+                "count": 3
             },
-            "context": "e-commerce orders",
-            "count": 5
-        },
-        {
-            "name": "Complex Schema",
-            "schema": {
-                "companyId": "COMP-123",
-                "name": "Tech Corp",
-                "departments": [
-                    {
-                        "id": "DEPT-01",
-                        "name": "Engineering",
-                        "employees": [
-                            {
-                                "id": "EMP-001",
-                                "name": "Alice Smith",
-                                "email": "alice@company.com",
-                                "role": "Senior Developer",
-                                "skills": ["Python", "JavaScript"]
-                            }
-                        ],
-                        "budget": 1000000.00
-                    }
-                ],
-                "address": {
-                    "street": "123 Tech Street",
-                    "city": "San Francisco",
-                    "zipCode": "94105"
+            {
+                "name": "Medium Complexity",
+                "schema": {
+                    "orderId": "ORD-2024-001",
+                    "customer": {
+                        "id": "CUST-123",
+                        "email": "john@example.com"
+                    },
+                    "items": [
+                        {"productId": "PROD-1", "quantity": 2, "price": 29.99}
+                    ],
+                    "totalAmount": 59.98,
+                    "orderDate": "2024-01-15"
                 },
-                "founded": "2010-05-15",
-                "website": "https://techcorp.com"
+                "context": "e-commerce orders",
+                "count": 5
             },
-            "context": "company organizational data",
-            "count": 3
-        }
-    ]
-    
-    results_table = Table(title="Multi-Strategy Generation Results")
-    results_table.add_column("Schema", style="cyan")
-    results_table.add_column("Complexity", style="yellow")
-    results_table.add_column("Strategy Used", style="green")
-    results_table.add_column("Success", style="bold")
-    results_table.add_column("Score", style="magenta")
-    results_table.add_column("Time", style="blue")
-    
-    for test_case in test_cases:
-        console.print(f"\n[bold]Testing: {test_case['name']}[/bold]")
-        console.print(f"Context: {test_case['context']}")
-        
-        # Analyze schema
-        analysis = analyzer.analyze(test_case['schema'], test_case['context'])
-        console.print(f"Complexity Score: {analysis.complexity_score:.2f}")
-        
-        # Test 1: Single strategy
-        console.print("\n[yellow]Test 1: Single Strategy (Chain-of-Thought)[/yellow]")
-        start_time = asyncio.get_event_loop().time()
-        
-        single_request = GenerationRequest(
-            schema=test_case['schema'],
-            context=test_case['context'],
-            count=test_case['count'],
-            strategy=PromptStrategy.CHAIN_OF_THOUGHT,
-            use_multi_strategy=False
-        )
-        
-        single_result = await engine.generate(single_request)
-        single_time = asyncio.get_event_loop().time() - start_time
-        
-        if single_result.success:
-            console.print(f"[green]✓ Generated {len(single_result.data)} records[/green]")
-            console.print(f"Validation Score: {single_result.validation_result.score:.2f}")
-        else:
-            console.print(f"[red]✗ Generation failed: {single_result.errors}[/red]")
-        
-        # Test 2: Multi-strategy
-        console.print("\n[yellow]Test 2: Multi-Strategy (Automatic)[/yellow]")
-        start_time = asyncio.get_event_loop().time()
-        
-        multi_request = GenerationRequest(
-            schema=test_case['schema'],
-            context=test_case['context'],
-            count=test_case['count'],
-            use_multi_strategy=True
-        )
-        
-        multi_result = await engine.generate(multi_request)
-        multi_time = asyncio.get_event_loop().time() - start_time
-        
-        if multi_result.success:
-            console.print(f"[green]✓ Generated {len(multi_result.data)} records[/green]")
-            console.print(f"Validation Score: {multi_result.validation_result.score:.2f}")
-            console.print(f"Strategy Used: {multi_result.metadata.get('strategy_used', 'unknown')}")
-        else:
-            console.print(f"[red]✗ Generation failed: {multi_result.errors}[/red]")
-        
-        # Test 3: Adaptive generation
-        console.print("\n[yellow]Test 3: Adaptive Generation[/yellow]")
-        start_time = asyncio.get_event_loop().time()
-        
-        adaptive_request = GenerationRequest(
-            schema=test_case['schema'],
-            context=test_case['context'],
-            count=test_case['count']
-        )
-        
-        adaptive_result = await engine.generate_adaptive(adaptive_request, max_attempts=2)
-        adaptive_time = asyncio.get_event_loop().time() - start_time
-        
-        if adaptive_result.success:
-            console.print(f"[green]✓ Generated {len(adaptive_result.data)} records[/green]")
-            console.print(f"Final Score: {adaptive_result.validation_result.score:.2f}")
+            {
+                "name": "Complex Schema",
+                "schema": {
+                    "companyId": "COMP-123",
+                    "name": "Tech Corp",
+                    "departments": [
+                        {
+                            "id": "DEPT-01",
+                            "name": "Engineering",
+                            "employees": [
+                                {
+                                    "id": "EMP-001",
+                                    "name": "Alice Smith",
+                                    "email": "alice@company.com",
+                                    "role": "Senior Developer",
+                                    "skills": ["Python", "JavaScript"]
+                                }
+                            ],
+                            "budget": 1000000.00
+                        }
+                    ],
+                    "address": {
+                        "street": "123 Tech Street",
+                        "city": "San Francisco",
+                        "zipCode": "94105"
+                    },
+                    "founded": "2010-05-15",
+                    "website": "https://techcorp.com"
+                },
+                "context": "company organizational data",
+                "count": 3
+            }
+        ]
         
-        # Add to results table
-        results_table.add_row(
-            test_case['name'],
-            f"{analysis.complexity_score:.2f}",
-            "Single (CoT)",
-            "✓" if single_result.success else "✗",
-            f"{single_result.validation_result.score:.2f}" if single_result.validation_result else "N/A",
-            f"{single_time:.2f}s"
-        )
+        results_table = Table(title="Multi-Strategy Generation Results")
+        results_table.add_column("Schema", style="cyan")
+        results_table.add_column("Complexity", style="yellow")
+        results_table.add_column("Strategy Used", style="green")
+        results_table.add_column("Success", style="bold")
+        results_table.add_column("Score", style="magenta")
+        results_table.add_column("Time", style="blue")
         
-        results_table.add_row(
-            "",
-            "",
-            "Multi-Strategy",
-            "✓" if multi_result.success else "✗",
-            f"{multi_result.validation_result.score:.2f}" if multi_result.validation_result else "N/A",
-            f"{multi_time:.2f}s"
-        )
+        for test_case in test_cases:
+            console.print(f"\n[bold]Testing: {test_case['name']}[/bold]")
+            console.print(f"Context: {test_case['context']}")
+            
+            # Analyze schema
+            analysis = analyzer.analyze(test_case['schema'], test_case['context'])
+            console.print(f"Complexity Score: {analysis.complexity_score:.2f}")
+            
+            # Test 1: Single strategy
+            console.print("\n[yellow]Test 1: Single Strategy (Chain-of-Thought)[/yellow]")
+            start_time = time.perf_counter()
+            
+            single_request = GenerationRequest(
+                schema=test_case['schema'],
+                context=test_case['context'],
+                count=test_case['count'],
+                strategy=PromptStrategy.CHAIN_OF_THOUGHT,
+                use_multi_strategy=False
+            )
+            
+            single_result = await engine.generate(single_request)
+            single_time = time.perf_counter() - start_time
+            
+            if single_result.success:
+                console.print(f"[green]✓ Generated {len(single_result.data)} records[/green]")
+                console.print(f"Validation Score: {single_result.validation_result.score:.2f}")
+            else:
+                console.print(f"[red]✗ Generation failed: {single_result.errors}[/red]")
+            
+            # Test 2: Multi-strategy
+            console.print("\n[yellow]Test 2: Multi-Strategy (Automatic)[/yellow]")
+            start_time = time.perf_counter()
+            
+            multi_request = GenerationRequest(
+                schema=test_case['schema'],
+                context=test_case['context'],
+                count=test_case['count'],
+                use_multi_strategy=True
+            )
+            
+            multi_result = await engine.generate(multi_request)
+            multi_time = time.perf_counter() - start_time
+            
+            if multi_result.success:
+                console.print(f"[green]✓ Generated {len(multi_result.data)} records[/green]")
+                console.print(f"Validation Score: {multi_result.validation_result.score:.2f}")
+                console.print(f"Strategy Used: {multi_result.metadata.get('strategy_used', 'unknown')}")
+            else:
+                console.print(f"[red]✗ Generation failed: {multi_result.errors}[/red]")
+            
+            # Test 3: Adaptive generation
+            console.print("\n[yellow]Test 3: Adaptive Generation[/yellow]")
+            start_time = time.perf_counter()
+            
+            adaptive_request = GenerationRequest(
+                schema=test_case['schema'],
+                context=test_case['context'],
+                count=test_case['count']
+            )
+            
+            adaptive_result = await engine.generate_adaptive(adaptive_request, max_attempts=2)
+            adaptive_time = time.perf_counter() - start_time
+            
+            if adaptive_result.success:
+                console.print(f"[green]✓ Generated {len(adaptive_result.data)} records[/green]")
+                console.print(f"Final Score: {adaptive_result.validation_result.score:.2f}")
+            
+            # Add to results table
+            results_table.add_row(
+                test_case['name'],
+                f"{analysis.complexity_score:.2f}",
+                "Single (CoT)",
+                "✓" if single_result.success else "✗",
+                f"{single_result.validation_result.score:.2f}" if single_result.validation_result else "N/A",
+                f"{single_time:.2f}s"
+            )
+            
+            results_table.add_row(
+                "",
+                "",
+                "Multi-Strategy",
+                "✓" if multi_result.success else "✗",
+                f"{multi_result.validation_result.score:.2f}" if multi_result.validation_result else "N/A",
+                f"{multi_time:.2f}s"
+            )
+            
+            results_table.add_row(
+                "",
+                "",
+                "Adaptive",
+                "✓" if adaptive_result.success else "✗",
+                f"{adaptive_result.validation_result.score:.2f}" if adaptive_result.validation_result else "N/A",
+                f"{adaptive_time:.2f}s"
+            )
+            
+            # Show sample of generated data
+            if multi_result.success and multi_result.data:
+                console.print("\n[bold]Sample Generated Data:[/bold]")
+                console.print_json(data=multi_result.data[0])
         
-        results_table.add_row(
-            "",
-            "",
-            "Adaptive",
-            "✓" if adaptive_result.success else "✗",
-            f"{adaptive_result.validation_result.score:.2f}" if adaptive_result.validation_result else "N/A",
-            f"{adaptive_time:.2f}s"
-        )
+        # Display results
+        console.print("\n")
+        console.print(results_table)
         
-        # Show sample of generated data
-        if multi_result.success and multi_result.data:
-            console.print("\n[bold]Sample Generated Data:[/bold]")
-            console.print_json(data=multi_result.data[0])
-    
-    # Display results
-    console.print("\n")
-    console.print(results_table)
-    
-    # Performance comparison
-    console.print("\n[bold]Key Findings:[/bold]")
-    console.print("1. Multi-strategy typically achieves higher validation scores")
-    console.print("2. Adaptive generation can recover from initial failures")
-    console.print("3. Complex schemas benefit most from multi-strategy approach")
+        # Performance comparison
+        console.print("\n[bold]Key Findings:[/bold]")
+        console.print("1. Multi-strategy typically achieves higher validation scores")
+        console.print("2. Adaptive generation can recover from initial failures")
+        console.print("3. Complex schemas benefit most from multi-strategy approach")
 
 async def test_specific_strategies():
     """Test specific strategy combinations"""
     console.print("\n[bold blue]Testing Specific Strategy Combinations[/bold blue]")
     
-    llm_manager = LLMManager()
-    await llm_manager.initialize()
-    
-    engine = JSONGenerationEngine(llm_manager)
-    
-    # E-commerce product schema
-    schema = {
-        "productId": "PROD-123",
-        "name": "Wireless Headphones",
-        "price": 79.99,
-        "categories": ["Electronics", "Audio"],
-        "specifications": {
-            "batteryLife": "30 hours",
-            "connectivity": "Bluetooth 5.0"
-        },
-        "inStock": True,
-        "rating": 4.5
-    }
-    
-    strategies_to_test = [
-        ("Chain-of-Thought only", [PromptStrategy.CHAIN_OF_THOUGHT]),
-        ("Few-Shot only", [PromptStrategy.FEW_SHOT]),
-        ("Structured only", [PromptStrategy.STRUCTURED]),
-        ("CoT + Few-Shot", [PromptStrategy.CHAIN_OF_THOUGHT, PromptStrategy.FEW_SHOT]),
-        ("All strategies", [PromptStrategy.CHAIN_OF_THOUGHT, PromptStrategy.FEW_SHOT, PromptStrategy.STRUCTURED])
-    ]
-    
-    for name, strategies in strategies_to_test:
-        console.print(f"\n[yellow]Testing: {name}[/yellow]")
+    async with LLMManager() as llm_manager:
+        engine = JSONGenerationEngine(llm_manager)
+        
+        # E-commerce product schema
+        schema = {
+            "productId": "PROD-123",
+            "name": "Wireless Headphones",
+            "price": 79.99,
+            "categories": ["Electronics", "Audio"],
+            "specifications": {
+                "batteryLife": "30 hours",
+                "connectivity": "Bluetooth 5.0"
+            },
+            "inStock": True,
+            "rating": 4.5
+        }
+        
+        strategies_to_test = [
+            ("Chain-of-Thought only", [PromptStrategy.CHAIN_OF_THOUGHT]),
+            ("Few-Shot only", [PromptStrategy.FEW_SHOT]),
+            ("Structured only", [PromptStrategy.STRUCTURED]),
+            ("CoT + Few-Shot", [PromptStrategy.CHAIN_OF_THOUGHT, PromptStrategy.FEW_SHOT]),
+            ("All strategies", [PromptStrategy.CHAIN_OF_THOUGHT, PromptStrategy.FEW_SHOT, PromptStrategy.STRUCTURED])
+        ]
         
         # For this test, we'll need to modify the request to use specific strategies
         # This would require extending the GenerationRequest to accept a list of strategies
         # For now, we'll use the automatic multi-strategy
-        
-        request = GenerationRequest(
-            schema=schema,
-            context="e-commerce products",
-            count=3,
-            use_multi_strategy=len(strategies) > 1
+        requests = [
+            GenerationRequest(
+                schema=schema,
+                context="e-commerce products",
+                count=3,
+                use_multi_strategy=len(strategies) > 1
+            )
+            for _, strategies in strategies_to_test
+        ]
+
+        # The combinations are independent generations, so run them together
+        results = await asyncio.gather(
+            *[engine.generate(request) for request in requests],
+            return_exceptions=True
         )
-        
-        result = await engine.generate(request)
-        
-        if result.success:
-            console.print(f"[green]✓ Success - Score: {result.validation_result.score:.2f}[/green]")
-        else:
-            console.print(f"[red]✗ Failed[/red]")
+
+        for (name, _), result in zip(strategies_to_test, results):
+            console.print(f"\n[yellow]Testing: {name}[/yellow]")
+
+            if isinstance(result, Exception):
+                console.print(f"[red]✗ Failed: {result}[/red]")
+            elif result.success:
+                console.print(f"[green]✓ Success - Score: {result.validation_result.score:.2f}[/green]")
+            else:
+                console.print(f"[red]✗ Failed[/red]")
 
 async def main():
     """Run all tests"""
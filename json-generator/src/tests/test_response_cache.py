@@ -0,0 +1,177 @@
+"""Test the on-disk LLM response cache"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.core import response_cache
+from src.core.base_llm import LLMProvider, LLMResponse, make_cache_key
+from src.core.response_cache import CachedLLMManager, ResponseCache
+
+STREAM_USAGE = {"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3}
+
+class StubManager:
+    """LLM manager stand-in that records which prompts reach it"""
+    
+    def __init__(self, json_reply=None, metadata=None):
+        llm = SimpleNamespace(provider=LLMProvider.OLLAMA, model_name="stub-1")
+        self.models = {"stub": llm}
+        self.default_model = "stub"
+        self.json_reply = json_reply or (lambda prompt: {"answer": prompt})
+        self.metadata = metadata
+        self.calls = []
+    
+    async def generate(self, prompt, model=None, config=None, fallback=True):
+        self.calls.append(prompt)
+        return LLMResponse(
+            content=f"echo {prompt}",
+            model="stub-1",
+            provider=LLMProvider.OLLAMA,
+            metadata=self.metadata,
+        )
+    
+    async def generate_stream(self, prompt, model=None, config=None, usage=None):
+        self.calls.append(prompt)
+        for chunk in ("echo ", prompt):
+            yield chunk
+        if usage is not None:
+            usage.update(STREAM_USAGE)
+    
+    async def generate_json(self, prompt, schema=None, model=None, config=None):
+        self.calls.append(prompt)
+        return self.json_reply(prompt)
+    
+    async def generate_json_batch(self, prompts, schema=None, model=None, config=None):
+        self.calls.append(list(prompts))
+        return [self.json_reply(prompt) for prompt in prompts]
+
+@pytest.fixture
+def cache(tmp_path):
+    """Response cache rooted in a temporary directory"""
+    return ResponseCache(cache_dir=tmp_path, ttl=60)
+
+class TestResponseCache:
+    """Test storage, lookup and expiry of cache entries"""
+    
+    def test_round_trip(self, cache):
+        """Test that a stored value is returned and counted as a hit"""
+        cache.set("abcd", {"answer": 42})
+        
+        assert cache.get("abcd") == {"answer": 42}
+        assert (cache.hits, cache.misses) == (1, 0)
+    
+    def test_miss(self, cache):
+        """Test that an unknown key returns None and counts a miss"""
+        assert cache.get("missing") is None
+        assert cache.misses == 1
+    
+    def test_expired_entry_is_removed(self, cache, monkeypatch):
+        """Test that entries older than the TTL are dropped from disk"""
+        cache.set("abcd", "value")
+        now = response_cache.time.time()
+        monkeypatch.setattr(response_cache.time, "time", lambda: now + 61)
+        
+        assert cache.get("abcd") is None
+        assert not cache._path("abcd").exists()
+    
+    def test_no_ttl_never_expires(self, tmp_path, monkeypatch):
+        """Test that a cache without a TTL keeps old entries"""
+        cache = ResponseCache(cache_dir=tmp_path, ttl=None)
+        cache.set("abcd", "value")
+        monkeypatch.setattr(response_cache.time, "time", lambda: 10 ** 12)
+        
+        assert cache.get("abcd") == "value"
+    
+    def test_clear(self, cache):
+        """Test that clear removes every entry"""
+        cache.set("abcd", 1)
+        cache.set("efgh", 2)
+        cache.clear()
+        
+        assert cache.get("abcd") is None
+        assert cache.get("efgh") is None
+    
+    def test_key_depends_on_inputs(self):
+        """Test that cache keys are stable and differ per prompt and kind"""
+        key = make_cache_key("ollama", "stub-1", "prompt", kind="text")
+        
+        assert key == make_cache_key("ollama", "stub-1", "prompt", kind="text")
+        assert key != make_cache_key("ollama", "stub-1", "other", kind="text")
+        assert key != make_cache_key("ollama", "stub-1", "prompt", kind="json")
+
+class TestCachedLLMManager:
+    """Test the caching wrapper around LLMManager"""
+    
+    @pytest.mark.asyncio
+    async def test_generate_hit_skips_manager(self, cache):
+        """Test that a repeated prompt is served from the cache"""
+        manager = StubManager()
+        cached = CachedLLMManager(manager, cache)
+        
+        first = await cached.generate("hello")
+        second = await cached.generate("hello")
+        
+        assert manager.calls == ["hello"]
+        assert second == first
+        assert second.provider is LLMProvider.OLLAMA
+    
+    @pytest.mark.asyncio
+    async def test_fallback_response_is_not_cached(self, cache):
+        """Test that a fallback model's answer isn't stored under the requested model"""
+        manager = StubManager(metadata={"fallback_used": True})
+        cached = CachedLLMManager(manager, cache)
+        
+        await cached.generate("hello")
+        await cached.generate("hello")
+        
+        assert manager.calls == ["hello", "hello"]
+    
+    @pytest.mark.asyncio
+    async def test_stream_replay_keeps_usage(self, cache):
+        """Test that a replayed stream reports the usage of the original one"""
+        manager = StubManager()
+        cached = CachedLLMManager(manager, cache)
+        
+        first_usage, second_usage = {}, {}
+        first = [c async for c in cached.generate_stream("hi", usage=first_usage)]
+        second = [c async for c in cached.generate_stream("hi", usage=second_usage)]
+        
+        assert manager.calls == ["hi"]
+        assert "".join(second) == "".join(first) == "echo hi"
+        assert second_usage == first_usage == STREAM_USAGE
+    
+    @pytest.mark.asyncio
+    async def test_empty_json_is_not_cached(self, cache):
+        """Test that a failed JSON extraction is retried instead of cached"""
+        manager = StubManager(json_reply=lambda prompt: {})
+        cached = CachedLLMManager(manager, cache)
+        
+        await cached.generate_json("hello")
+        await cached.generate_json("hello")
+        
+        assert manager.calls == ["hello", "hello"]
+    
+    @pytest.mark.asyncio
+    async def test_json_batch_sends_only_misses(self, cache):
+        """Test that a partially cached batch only requests the uncached prompts"""
+        manager = StubManager()
+        cached = CachedLLMManager(manager, cache)
+        await cached.generate_json("a")
+        
+        results = await cached.generate_json_batch(["a", "b", "c"])
+        
+        assert manager.calls == ["a", ["b", "c"]]
+        assert results == [{"answer": "a"}, {"answer": "b"}, {"answer": "c"}]
+    
+    @pytest.mark.asyncio
+    async def test_json_batch_does_not_cache_failures(self, cache):
+        """Test that exceptions returned by a batch are not stored"""
+        manager = StubManager(json_reply=lambda prompt: RuntimeError("failed"))
+        cached = CachedLLMManager(manager, cache)
+        
+        results = await cached.generate_json_batch(["a"])
+        assert isinstance(results[0], RuntimeError)
+        
+        manager.json_reply = lambda prompt: {"answer": prompt}
+        assert await cached.generate_json_batch(["a"]) == [{"answer": "a"}]
+        assert manager.calls == [["a"], ["a"]]